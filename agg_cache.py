@@ -0,0 +1,84 @@
+"""
+Caché de agregaciones del dashboard de GateGroup Airlines
+Guarda los resultados de cada sección por estado de filtros, con desalojo LRU bajo un presupuesto de memoria
+"""
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# Presupuesto de memoria de la caché (compartida por todas las sesiones del proceso)
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+
+def filter_key(fecha_inicio, fecha_fin, selections, **options):
+    """Clave canónica de un estado de filtros
+
+    Las selecciones sin filtro (None) se omiten y el resto se ordena por
+    columna, así que dos sesiones con los mismos filtros comparten clave sin
+    importar el orden en que se construyó el diccionario.
+    """
+    active = tuple(sorted((col, value) for col, value in selections.items() if value is not None))
+    return (str(fecha_inicio), str(fecha_fin), active, tuple(sorted(options.items())))
+
+
+def result_size(value):
+    """Bytes aproximados de un resultado (DataFrame, Series, arreglo o contenedor de ellos)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(result_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(result_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class AggregationCache:
+    """LRU de resultados por (sección, estado de filtros) con presupuesto en bytes
+
+    Las sesiones de Streamlit corren en hilos del mismo proceso, por eso el
+    acceso a las entradas va con un lock. Los resultados se comparten entre
+    sesiones: quien los lee no debe modificarlos.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """Resultado guardado para `key`, o `compute()` si no está (y se guarda)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # El cálculo va fuera del lock para no bloquear a las demás sesiones
+        value = compute()
+        size = result_size(value)
+        with self._lock:
+            if key not in self._entries and size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.bytes += size
+                while self.bytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self.bytes -= evicted
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
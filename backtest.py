@@ -0,0 +1,243 @@
+"""
+Backtest con origen móvil (rolling origin) de los modelos de series temporales
+Cada origen pronostica los horizontes pedidos; los folds corren en paralelo y los modelos de
+espacio de estados se actualizan con `extend` en vez de re-estimarse en cada origen
+
+Uso:
+    python backtest.py                                      # ventas diarias totales
+    python backtest.py --levels warehouse --horizons 7 14 --folds 12
+    python backtest.py --levels ruta --top 50 --workers 8
+"""
+import argparse
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from baselines import forecast_metrics, seasonal_naive
+from features import daily_series
+from forecasting import ORDER, SEASONAL_ORDER, SEASONAL_PERIOD, SERIES_LEVELS, load_series
+from order_search import model_trend
+from storage import read_clean_data
+
+# Rutas
+output_backtest = r'Data\Clean\backtest_folds.csv'
+output_backtest_summary = r'Data\Clean\backtest_resumen.csv'
+
+# Modelos comparados (los del notebook más la referencia seasonal naive) y sus órdenes
+BACKTEST_MODELS = ['arima', 'sarima', 'holt_winters', 'seasonal_naive']
+MODEL_ORDERS = {
+    'arima': (ORDER, (0, 0, 0, 0)),
+    'sarima': (ORDER, SEASONAL_ORDER),
+}
+
+# Horizontes evaluados en cada origen, número de orígenes, días entre orígenes y entrenamiento mínimo
+HORIZONS = [7, 14, 30]
+FOLDS = 8
+STEP = 7
+MIN_TRAIN = 60
+
+
+def rolling_origins(n, horizon, folds=FOLDS, step=STEP, min_train=MIN_TRAIN):
+    """Índices de corte (primer día de prueba) de cada fold, del más viejo al más nuevo
+
+    El último fold termina justo al final de la serie; los anteriores se
+    corren `step` días hacia atrás. Se descartan los que dejan menos de
+    `min_train` días de entrenamiento.
+    """
+    last = n - horizon
+    origins = [last - k * step for k in range(folds - 1, -1, -1)]
+    return [origin for origin in origins if origin >= min_train]
+
+
+def holt_winters_filter(y, params):
+    """Holt-Winters aditivo con parámetros y estado inicial ya estimados (solo recorre la serie)"""
+    model = ExponentialSmoothing(y, seasonal_periods=SEASONAL_PERIOD, trend='add', seasonal='add',
+                                 initialization_method='known',
+                                 initial_level=params['initial_level'],
+                                 initial_trend=params['initial_trend'],
+                                 initial_seasonal=params['initial_seasons'])
+    return model.fit(smoothing_level=params['smoothing_level'],
+                     smoothing_trend=params['smoothing_trend'],
+                     smoothing_seasonal=params['smoothing_seasonal'],
+                     optimized=False)
+
+
+def estimate(y, model, orders=MODEL_ORDERS):
+    """Parámetros de `model` estimados una sola vez con la primera ventana de entrenamiento
+
+    Devuelve (parámetros, segundos); los parámetros son None si el ajuste falla.
+    """
+    started = time.perf_counter()
+    params = None
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            if model in orders:
+                order, seasonal_order = orders[model]
+                params = SARIMAX(y, order=order, seasonal_order=seasonal_order,
+                                 trend=model_trend(order, seasonal_order)).fit(disp=False).params
+            elif model == 'holt_winters':
+                params = ExponentialSmoothing(y, seasonal_periods=SEASONAL_PERIOD,
+                                              trend='add', seasonal='add').fit().params
+    except Exception:
+        params = None
+    return params, time.perf_counter() - started
+
+
+def backtest_block(y, model, params, origins, horizon, orders=MODEL_ORDERS):
+    """Tarea del pool: pronósticos de un bloque de orígenes consecutivos
+
+    El primer origen del bloque filtra la serie con los parámetros ya
+    estimados; los siguientes solo agregan los días nuevos con `extend`.
+    Devuelve [(origen, pronóstico, segundos)].
+    """
+    out, state, previous = [], None, None
+    for origin in origins:
+        started = time.perf_counter()
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                if model == 'seasonal_naive':
+                    forecast = seasonal_naive(y[:origin], horizon)
+                elif params is None:
+                    forecast = np.full(horizon, np.nan)
+                elif model in orders:
+                    if state is None:
+                        order, seasonal_order = orders[model]
+                        state = SARIMAX(y[:origin], order=order, seasonal_order=seasonal_order,
+                                        trend=model_trend(order, seasonal_order)).filter(params)
+                    else:
+                        state = state.extend(y[previous:origin])
+                    forecast = state.forecast(horizon)
+                else:
+                    forecast = holt_winters_filter(y[:origin], params).forecast(horizon)
+        except Exception:
+            forecast, state = np.full(horizon, np.nan), None
+        out.append((origin, np.asarray(forecast, dtype=np.float64), time.perf_counter() - started))
+        previous = origin
+    return out
+
+
+def backtest(series, models=BACKTEST_MODELS, horizons=HORIZONS, folds=FOLDS, step=STEP, min_train=MIN_TRAIN,
+             workers=os.cpu_count(), orders=MODEL_ORDERS):
+    """Backtest con origen móvil de cada columna de `series` (fecha x serie)
+
+    Los parámetros de cada serie y modelo se estiman una vez, en paralelo, con
+    los datos anteriores al primer origen. Luego los orígenes se reparten en
+    bloques entre los procesos libres y cada bloque se actualiza con `extend`.
+    Devuelve una fila por serie, modelo, fold y horizonte con MAE, RMSE, R² y
+    segundos (del fold y de la estimación inicial).
+    """
+    horizon = max(horizons)
+    origins = rolling_origins(len(series), horizon, folds, step, min_train)
+    if not origins:
+        raise ValueError(f"La serie tiene {len(series)} días: no alcanza para {min_train} de entrenamiento "
+                         f"y {horizon} de prueba")
+    values = {name: series[name].to_numpy(dtype=np.float64) for name in series.columns}
+    tasks = [(name, model) for name in values for model in models]
+    n_blocks = min(len(origins), max(1, (workers or 1) // len(tasks)))
+    blocks = [list(block) for block in np.array_split(origins, n_blocks)]
+    jobs = [(task, block) for task in tasks for block in blocks]
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    run = pool.map if pool else map
+    try:
+        fits = list(run(estimate, [values[name][:origins[0]] for name, _ in tasks], [m for _, m in tasks],
+                        [orders] * len(tasks)))
+        fits = dict(zip(tasks, fits))
+        results = list(run(backtest_block,
+                           [values[name] for (name, _), _ in jobs], [model for (_, model), _ in jobs],
+                           [fits[task][0] for task, _ in jobs], [block for _, block in jobs],
+                           [horizon] * len(jobs), [orders] * len(jobs)))
+    finally:
+        if pool:
+            pool.shutdown()
+
+    fold_of = {origin: i for i, origin in enumerate(origins)}
+    rows = []
+    for ((name, model), _), block in zip(jobs, results):
+        y = values[name]
+        for origin, forecast, seconds in block:
+            for h in horizons:
+                rows.append({
+                    'serie': name,
+                    'modelo': model,
+                    'fold': fold_of[origin],
+                    'origen': series.index[origin - 1],
+                    'horizonte': h,
+                    **forecast_metrics(y[origin:origin + h], forecast[:h]),
+                    'segundos': seconds,
+                    'ajuste_s': fits[(name, model)][1],
+                })
+    return pd.DataFrame(rows)
+
+
+def summarize(folds):
+    """Promedio de métricas por serie, modelo y horizonte, con el ranking por MAE"""
+    summary = folds.groupby(['serie', 'horizonte', 'modelo'])[['MAE', 'RMSE', 'R²', 'segundos']].mean()
+    summary['ranking'] = summary.groupby(level=['serie', 'horizonte'])['MAE'].rank(method='min')
+    return summary.reset_index().sort_values(['serie', 'horizonte', 'ranking'])
+
+
+def write_backtest(folds, summary, path=output_backtest, summary_path=output_backtest_summary):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    folds.to_csv(path, index=False)
+    summary.to_csv(summary_path, index=False)
+
+
+def load_backtest_series(levels, top=None):
+    """Series a evaluar: 'total' es la serie diaria de ventas del notebook; el resto, las de forecasting.py
+
+    Con `top` se toman solo las series con más ventas de cada nivel.
+    """
+    series = {}
+    if 'total' in levels:
+        ts_daily = daily_series(read_clean_data(columns=['fecha', 'sales', 'passengers', 'lost_sales', 'flight_key']))
+        series['total'] = ts_daily[['sales']].rename(columns={'sales': 'total'})
+    grouped = [level for level in levels if level != 'total']
+    if grouped:
+        for level, wide in load_series(grouped).items():
+            if top:
+                wide = wide[wide.sum().nlargest(top).index]
+            series[level] = wide.add_prefix(f"{level}=")
+    return pd.concat(series.values(), axis=1).fillna(0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest con origen móvil de ARIMA, SARIMA y Holt-Winters")
+    parser.add_argument('--levels', nargs='+', choices=['total'] + SERIES_LEVELS, default=['total'],
+                        help="Series a evaluar ('total' = ventas diarias totales)")
+    parser.add_argument('--top', type=int, default=None, help="Solo las N series con más ventas de cada nivel")
+    parser.add_argument('--models', nargs='+', choices=BACKTEST_MODELS, default=BACKTEST_MODELS)
+    parser.add_argument('--horizons', nargs='+', type=int, default=HORIZONS, help="Días de pronóstico evaluados")
+    parser.add_argument('--folds', type=int, default=FOLDS, help="Número de orígenes")
+    parser.add_argument('--step', type=int, default=STEP, help="Días entre orígenes consecutivos")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Procesos para estimar modelos y correr folds (1 = secuencial)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("📊 Armando series diarias...")
+    series = load_backtest_series(args.levels, args.top)
+
+    print(f"🔁 Backtest de {series.shape[1]:,} series x {len(args.models)} modelos "
+          f"({args.folds} folds, horizontes {args.horizons})...")
+    started = time.perf_counter()
+    folds = backtest(series, args.models, args.horizons, args.folds, args.step, workers=args.workers)
+    summary = summarize(folds)
+    print(f"⚡ Completado en {time.perf_counter() - started:.1f} s")
+
+    write_backtest(folds, summary)
+    best = summary[summary['ranking'] == 1]['modelo'].value_counts()
+    print(f"🥇 Mejor modelo por serie y horizonte: {best.to_dict()}")
+    print(f"✅ Resultados guardados en: {output_backtest} y {output_backtest_summary}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Pronósticos base vectorizados con NumPy para miles de series a la vez
+Seasonal naive, media móvil estacional semanal y Holt-Winters aditivo (periodo 7) sobre una matriz
+series x días, más las métricas MAE/RMSE/R² del notebook
+
+Uso:
+    python baselines.py                        # series por ruta, warehouse e item_code
+    python baselines.py --levels item_code --holdout 28
+"""
+import argparse
+import itertools
+import time
+import numpy as np
+import pandas as pd
+
+SEASONAL_PERIOD = 7
+
+# Semanas promediadas por la media móvil estacional
+MA_WEEKS = 4
+
+# Grilla de parámetros (alpha, beta, gamma) de Holt-Winters; cada serie se queda con la de menor error
+HW_GRID = list(itertools.product([0.1, 0.3, 0.5, 0.7, 0.9], [0.01, 0.05, 0.1, 0.2], [0.05, 0.1, 0.3, 0.5]))
+
+# Series procesadas juntas por Holt-Winters (acota la memoria: series x grilla x periodo)
+CHUNK_ROWS = 2048
+
+# Días del final usados para elegir el mejor pronóstico base de cada serie
+HOLDOUT = 14
+
+
+def forecast_metrics(y_true, y_pred):
+    """MAE, RMSE y R² (mismas definiciones que sklearn, como en time_series_model.ipynb)
+
+    Con matrices (series x días) se calcula una métrica por serie.
+    """
+    y_true = np.asarray(y_true, dtype=np.float64)
+    y_pred = np.asarray(y_pred, dtype=np.float64)
+    error = y_true - y_pred
+    ss_res = (error ** 2).sum(axis=-1)
+    ss_tot = ((y_true - y_true.mean(axis=-1, keepdims=True)) ** 2).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 0.0)
+    return {
+        'MAE': np.abs(error).mean(axis=-1),
+        'RMSE': np.sqrt((error ** 2).mean(axis=-1)),
+        'R²': r2[()],
+    }
+
+
+def seasonal_naive(y, horizon, period=SEASONAL_PERIOD):
+    """Repite la última semana observada (o el último valor si la serie es más corta)
+
+    `y` puede ser una serie o una matriz series x días.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    last = y[..., -period:] if y.shape[-1] >= period else y[..., -1:]
+    return np.take(last, np.arange(horizon) % last.shape[-1], axis=-1)
+
+
+def seasonal_moving_average(y, horizon, period=SEASONAL_PERIOD, weeks=MA_WEEKS):
+    """Promedio de las últimas `weeks` semanas para cada día de la semana, repetido hacia adelante"""
+    y = np.asarray(y, dtype=np.float64)
+    weeks = min(weeks, y.shape[-1] // period)
+    if weeks == 0:
+        return seasonal_naive(y, horizon, period)
+    recent = y[..., y.shape[-1] - weeks * period:]
+    profile = recent.reshape(*y.shape[:-1], weeks, period).mean(axis=-2)
+    return np.take(profile, np.arange(horizon) % period, axis=-1)
+
+
+def _holt_winters_chunk(y, horizon, period, alpha, beta, gamma):
+    """Holt-Winters de un bloque de series (n x días) con todas las combinaciones de la grilla
+
+    Los estados tienen forma (n, grilla) y la estacionalidad (n, grilla, periodo):
+    cada paso de tiempo es una sola operación para todas las series y combinaciones.
+    """
+    n, T = y.shape
+    grid = len(alpha)
+    level = np.repeat(y[:, :period].mean(axis=1, keepdims=True), grid, axis=1)
+    trend = np.repeat(((y[:, period:2 * period].mean(axis=1) - y[:, :period].mean(axis=1)) / period)[:, None],
+                      grid, axis=1)
+    season = np.repeat((y[:, :period] - level[:, :1])[:, None, :], grid, axis=1)
+    sse = np.zeros((n, grid))
+    for t in range(T):
+        s = season[:, :, t % period]
+        obs = y[:, t:t + 1]
+        if t >= period:
+            # El error a un paso se cuenta después de la semana usada para inicializar
+            sse += (obs - (level + trend + s)) ** 2
+        new_level = alpha * (obs - s) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[:, :, t % period] = gamma * (obs - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = sse.argmin(axis=1)
+    rows = np.arange(n)
+    steps = np.arange(1, horizon + 1)
+    seasonal = season[rows, best][:, (T + steps - 1) % period]
+    forecast = level[rows, best][:, None] + steps * trend[rows, best][:, None] + seasonal
+    return forecast, best
+
+
+def holt_winters(y, horizon, period=SEASONAL_PERIOD, grid=HW_GRID, chunk_rows=CHUNK_ROWS):
+    """Holt-Winters aditivo (tendencia y estacionalidad aditivas) para cada fila de `y`
+
+    Los parámetros se eligen por serie dentro de `grid` con el menor error
+    cuadrático a un paso. Las series con menos de dos semanas usan seasonal
+    naive. Devuelve (pronósticos series x horizonte, parámetros elegidos).
+    """
+    y = np.atleast_2d(np.asarray(y, dtype=np.float64))
+    if y.shape[1] < 2 * period:
+        return seasonal_naive(y, horizon, period), np.full((len(y), 3), np.nan)
+    alpha, beta, gamma = (np.asarray(values) for values in zip(*grid))
+    forecasts, chosen = [], []
+    for start in range(0, len(y), chunk_rows):
+        forecast, best = _holt_winters_chunk(y[start:start + chunk_rows], horizon, period, alpha, beta, gamma)
+        forecasts.append(forecast)
+        chosen.append(np.column_stack([alpha[best], beta[best], gamma[best]]))
+    return np.vstack(forecasts), np.vstack(chosen)
+
+
+BASELINES = {
+    'seasonal_naive': seasonal_naive,
+    'media_movil_semanal': seasonal_moving_average,
+    'holt_winters_np': lambda y, horizon: holt_winters(y, horizon)[0],
+}
+
+
+def evaluate_baselines(y, holdout=HOLDOUT):
+    """Métricas por serie de cada pronóstico base sobre los últimos `holdout` días
+
+    Devuelve {nombre: {'MAE': arreglo, 'RMSE': arreglo, 'R²': arreglo}}.
+    """
+    y = np.atleast_2d(np.asarray(y, dtype=np.float64))
+    train, test = y[:, :-holdout], y[:, -holdout:]
+    return {name: forecast_metrics(test, method(train, holdout)) for name, method in BASELINES.items()}
+
+
+def best_baseline(y, horizon, holdout=HOLDOUT):
+    """Pronóstico de cada serie con el método base de menor MAE en los últimos `holdout` días
+
+    Devuelve (pronósticos series x horizonte, nombre del método por serie, MAE del holdout).
+    """
+    y = np.atleast_2d(np.asarray(y, dtype=np.float64))
+    names = list(BASELINES)
+    if y.shape[1] <= holdout + SEASONAL_PERIOD:
+        return seasonal_naive(y, horizon), np.full(len(y), 'seasonal_naive'), np.full(len(y), np.nan)
+    scores = evaluate_baselines(y, holdout)
+    mae = np.column_stack([scores[name]['MAE'] for name in names])
+    best = mae.argmin(axis=1)
+    forecasts = np.stack([BASELINES[name](y, horizon) for name in names], axis=1)
+    return forecasts[np.arange(len(y)), best], np.asarray(names)[best], mae[np.arange(len(y)), best]
+
+
+def parse_args(argv, levels):
+    parser = argparse.ArgumentParser(description="Evalúa los pronósticos base vectorizados por serie")
+    parser.add_argument('--levels', nargs='+', choices=levels, default=levels,
+                        help="Niveles de agregación de las series")
+    parser.add_argument('--holdout', type=int, default=HOLDOUT, help="Días finales usados para evaluar")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    # forecasting.py importa este módulo: se importa aquí para no formar un ciclo
+    from forecasting import SERIES_LEVELS, load_series
+
+    args = parse_args(argv, SERIES_LEVELS)
+    print("📊 Armando series diarias...")
+    for level, wide in load_series(args.levels).items():
+        values = wide.to_numpy(dtype=np.float64).T
+        started = time.perf_counter()
+        scores = evaluate_baselines(values, args.holdout)
+        elapsed = time.perf_counter() - started
+        summary = pd.DataFrame({name: {metric: np.nanmean(v) for metric, v in s.items()}
+                                for name, s in scores.items()}).T
+        print(f"\n⚡ {level}: {values.shape[0]:,} series evaluadas en {elapsed:.2f} s")
+        print(summary.to_string(float_format=lambda v: f"{v:,.3f}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+Benchmark de escalamiento de la pipeline de GateGroup Airlines sobre datos sintéticos
+Mide tiempo y memoria pico de la limpieza, las transformaciones y el cubo del dashboard y la serie diaria
+
+Uso:
+    python benchmark.py                                  # 100k, 1M, 10M y 50M filas
+    python benchmark.py --sizes 100000 1000000           # solo algunos tamaños
+    python benchmark.py --data-dir Data/Synthetic        # conserva (y reutiliza) los CSV generados
+    python benchmark.py --stages clean_streaming daily_series --no-memory
+"""
+import argparse
+import csv
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import pandas as pd
+from clean_data import DataCleaningPipeline
+from cube import materialize_cube
+from features import daily_series, materialize_features, read_features
+from schema import read_raw_csv
+from shared_data import load_shared, write_arrow
+from storage import ParquetPartitionWriter, read_clean_data
+from synthetic import write_synthetic_csv
+
+# Rutas
+output_benchmarks = r'Data\Benchmarks\benchmark_results.csv'
+
+DEFAULT_SIZES = [100_000, 1_000_000, 10_000_000, 50_000_000]
+STAGES = ['clean_in_memory', 'clean_streaming', 'materialize_features', 'load_data', 'load_shared',
+          'materialize_cube', 'daily_series']
+
+# Por encima de este tamaño la limpieza en memoria se omite (el archivo completo no cabe)
+IN_MEMORY_LIMIT = 10_000_000
+
+# Campos de cada registro del historial de benchmarks
+RESULT_FIELDS = ['fecha_ejecucion', 'commit', 'python', 'pandas', 'rows', 'stage',
+                 'wall_s', 'cpu_s', 'peak_mem_bytes', 'rows_in', 'rows_out']
+
+
+def git_commit():
+    """Commit actual del repositorio (vacío si no hay git)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def measure(func, *args, memory=True):
+    """Ejecuta `func` y devuelve (resultado, segundos de reloj, segundos de CPU, memoria pico)
+
+    La memoria pico se mide con tracemalloc, que también registra los buffers
+    de numpy y pandas; como encarece la ejecución, `memory=False` la omite.
+    """
+    if memory:
+        tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        result = func(*args)
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+        if memory:
+            tracemalloc.stop()
+    return result, wall, cpu, peak
+
+
+def clean_in_memory(raw_path, parquet_path):
+    """Limpieza con el archivo completo en memoria (como `python clean_data.py`)"""
+    df = DataCleaningPipeline(verbose=False).clean(read_raw_csv(raw_path))
+    ParquetPartitionWriter(parquet_path).write(df)
+    return len(df)
+
+
+def clean_streaming(raw_path, parquet_path, chunksize):
+    """Limpieza por bloques (como `python clean_data.py --chunksize N`)"""
+    writer = ParquetPartitionWriter(parquet_path)
+    DataCleaningPipeline(chunksize=chunksize, verbose=False).clean_file(raw_path, on_chunk=writer.write)
+    return writer.rows
+
+
+def load_daily_series(parquet_path):
+    """Serie diaria de time_series_model.ipynb a partir del Parquet limpio"""
+    df = read_clean_data(parquet_path, columns=['fecha', 'sales', 'passengers', 'lost_sales', 'flight_key'])
+    return daily_series(df)
+
+
+def run_size(n_rows, data_dir, stages, chunksize, seed, memory):
+    """Genera (o reutiliza) el CSV de `n_rows` filas y mide cada etapa pedida"""
+    raw_path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}.csv")
+    parquet_path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}_parquet")
+    features_path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}_features")
+    cube_path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}_cube.parquet")
+    arrow_path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}_features.arrow")
+    dimensions_path = os.path.join(data_dir, f"synthetic_{n_rows}_{seed}_dimensions")
+    if not os.path.isfile(raw_path):
+        print(f"📝 Generando {n_rows:,} filas sintéticas...")
+        write_synthetic_csv(raw_path, n_rows, seed)
+
+    records = []
+
+    def record(stage, wall, cpu, peak, rows_in, rows_out):
+        records.append({'rows': n_rows, 'stage': stage, 'wall_s': wall, 'cpu_s': cpu,
+                        'peak_mem_bytes': peak, 'rows_in': rows_in, 'rows_out': rows_out})
+        peak_mb = f"{peak / 1e6:,.1f} MB" if peak is not None else '-'
+        print(f"  {stage:<22}{wall:>10.2f} s{cpu:>10.2f} s CPU{peak_mb:>14}")
+
+    # La limpieza deja el Parquet que usan las etapas siguientes; sin ella se limpia por bloques
+    cleaned = None
+    if 'clean_in_memory' in stages and n_rows <= IN_MEMORY_LIMIT:
+        cleaned, *stats = measure(clean_in_memory, raw_path, parquet_path, memory=memory)
+        record('clean_in_memory', *stats, n_rows, cleaned)
+    elif 'clean_in_memory' in stages:
+        print(f"  clean_in_memory       omitido (más de {IN_MEMORY_LIMIT:,} filas)")
+    if 'clean_streaming' in stages:
+        cleaned, *stats = measure(clean_streaming, raw_path, parquet_path, chunksize, memory=memory)
+        record('clean_streaming', *stats, n_rows, cleaned)
+    derived = {'materialize_features', 'load_data', 'load_shared', 'materialize_cube', 'daily_series'}
+    if cleaned is None and set(stages) & derived:
+        cleaned = clean_streaming(raw_path, parquet_path, chunksize)
+
+    # Variables del dashboard: cálculo offline y carga en el arranque (`load_data`)
+    if 'materialize_features' in stages:
+        rows, *stats = measure(materialize_features, parquet_path, features_path, dimensions_path, memory=memory)
+        record('materialize_features', *stats, cleaned, rows)
+    elif set(stages) & {'load_data', 'load_shared', 'materialize_cube'}:
+        materialize_features(parquet_path, features_path, dimensions_path)
+    if 'load_data' in stages:
+        df, *stats = measure(read_features, features_path, memory=memory)
+        record('load_data', *stats, cleaned, len(df))
+        del df
+    if 'load_shared' in stages:
+        # Apertura del archivo Arrow mapeado (la exportación no se mide): memoria por proceso del dashboard
+        write_arrow(read_features(features_path), arrow_path)
+        df, *stats = measure(load_shared, features_path, arrow_path, memory=memory)
+        record('load_shared', *stats, cleaned, len(df))
+        del df
+    if 'materialize_cube' in stages:
+        cells, *stats = measure(materialize_cube, features_path, cube_path, memory=memory)
+        record('materialize_cube', *stats, cleaned, cells)
+    if 'daily_series' in stages:
+        ts_daily, *stats = measure(load_daily_series, parquet_path, memory=memory)
+        record('daily_series', *stats, cleaned, len(ts_daily))
+
+    return records
+
+
+def write_results(records, run_info, path=output_benchmarks):
+    """Agrega los resultados al historial CSV (uno por corrida y tamaño, para comparar entre versiones)"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    new_file = not os.path.isfile(path)
+    with open(path, 'a', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows({**run_info, **r} for r in records)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escalamiento sobre datos sintéticos")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Número de filas de cada dataset sintético")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help="Etapas a medir")
+    parser.add_argument('--chunksize', type=int, default=1_000_000,
+                        help="Tamaño de bloque de la limpieza en modo streaming")
+    parser.add_argument('--data-dir', default=None,
+                        help="Carpeta para los CSV sintéticos (se conservan); por defecto una temporal")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla del generador sintético")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="No medir la memoria pico (tracemalloc hace la corrida más lenta)")
+    parser.add_argument('--output', default=output_benchmarks, help="CSV donde se agregan los resultados")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='gate_benchmark_')
+    run_info = {
+        'fecha_ejecucion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+    }
+
+    print("=" * 80)
+    print("⏱️ BENCHMARK DE ESCALAMIENTO")
+    print("=" * 80)
+    try:
+        for n_rows in args.sizes:
+            print(f"\n📊 {n_rows:,} filas")
+            records = run_size(n_rows, data_dir, args.stages, args.chunksize, args.seed, not args.no_memory)
+            # Guardar después de cada tamaño para no perder resultados si uno grande falla
+            write_results(records, run_info, args.output)
+    finally:
+        if args.data_dir is None:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"\n📄 Resultados agregados a: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
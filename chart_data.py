@@ -0,0 +1,92 @@
+"""
+Datos resumidos para las gráficas del dashboard de GateGroup Airlines
+Histogramas, estadísticas de caja y reducción de series en el servidor: a Plotly solo llega el resumen
+"""
+import numpy as np
+import pandas as pd
+
+# Puntos máximos de una serie de línea y valores atípicos que se dibujan en una caja
+MAX_LINE_POINTS = 1000
+MAX_OUTLIERS = 500
+
+
+def histogram_bins(values, nbins=50):
+    """Conteo por intervalo de `values` (NaN excluidos) con `nbins` intervalos de igual ancho"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return pd.DataFrame({'desde': [], 'hasta': [], 'centro': [], 'count': []})
+    counts, edges = np.histogram(values, bins=nbins)
+    return pd.DataFrame({
+        'desde': edges[:-1],
+        'hasta': edges[1:],
+        'centro': (edges[:-1] + edges[1:]) / 2,
+        'count': counts,
+    })
+
+
+def box_stats(values, max_outliers=MAX_OUTLIERS):
+    """Cuartiles, bigotes (1.5 IQR, como Plotly) y una muestra de los valores atípicos
+
+    Los atípicos se toman a intervalos regulares de su orden, así que se
+    conservan los extremos y la forma de la cola sin enviarlos todos.
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if len(outliers) > max_outliers:
+        outliers = outliers[np.linspace(0, len(outliers) - 1, max_outliers).round().astype(np.int64)]
+    return {
+        'q1': q1, 'median': median, 'q3': q3,
+        'lowerfence': inside[0], 'upperfence': inside[-1],
+        'mean': values.mean(), 'outliers': outliers,
+    }
+
+
+def lttb(x, y, n_out=MAX_LINE_POINTS):
+    """Posiciones de los puntos elegidos por Largest-Triangle-Three-Buckets
+
+    Conserva el primero y el último; de cada cubeta intermedia elige el punto
+    que forma el triángulo de mayor área con el punto elegido anterior y el
+    promedio de la cubeta siguiente, de modo que se mantienen picos y valles.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[previous] - avg_x) * (y[lo:hi] - y[previous])
+                      - (x[previous] - x[lo:hi]) * (avg_y - y[previous]))
+        previous = lo + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample_line(df, x, y, n_out=MAX_LINE_POINTS):
+    """Filas de `df` (ordenado por `x`) reducidas con LTTB a lo más `n_out` puntos"""
+    if len(df) <= n_out:
+        return df
+    x_values = df[x].to_numpy()
+    if np.issubdtype(x_values.dtype, np.datetime64):
+        x_values = x_values.astype('datetime64[ns]').astype(np.int64)
+    return df.iloc[lttb(x_values, df[y].to_numpy(), n_out)]
+
+
+def stratified_sample(df, by, n, seed=0):
+    """Muestra reproducible de unas `n` filas con cada estrato de `by` en su proporción"""
+    if len(df) <= n:
+        return df
+    return df.groupby(by, observed=True, group_keys=False).sample(frac=n / len(df), random_state=seed)
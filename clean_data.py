@@ -1,242 +1,989 @@
 """
 Pipeline de limpieza de datos para GateGroup Airlines
 Elimina duplicados, valores nulos, y datos anómalos
+
+Uso:
+    python clean_data.py                     # carga cada archivo completo en memoria
+    python clean_data.py --chunksize 200000  # modo streaming por bloques (memoria acotada)
+    python clean_data.py --format parquet    # solo Parquet particionado por mes
+    python clean_data.py "Data/Raw/*.csv" --workers 8  # varios archivos en paralelo
+    python clean_data.py --fused             # pasos 3-6 con una sola máscara y un solo filtrado
+    python clean_data.py "Data/Raw/*.csv" --incremental  # solo archivos nuevos o modificados
+    python clean_data.py --profile           # métricas con memoria pico y tabla resumen por paso
 """
+import argparse
+import csv
+import glob
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from cube import cube_is_stale, materialize_cube, output_cube
 from datetime import datetime
+from features import features_are_stale, materialize_features, output_features, read_features
+from manifest import CleaningManifest, file_id, file_sha256
+from schema import read_raw_csv
+from shared_data import arrow_is_stale, output_arrow, write_arrow
+from storage import ParquetPartitionWriter, output_parquet, remove_parts
 
 # Rutas
 file_a = r'Data\Raw\result_hack 3.2 REDUCED A.csv'
 file_b = r'Data\Raw\result_hack 3.2 REDUCED b.csv'
 output_combined = r'Data\Clean\cleaned_data_combined.csv'
 output_report = r'Data\Clean\cleaning_report.txt'
+output_metrics_json = r'Data\Clean\cleaning_metrics.json'
+output_metrics_csv = r'Data\Clean\cleaning_metrics.csv'
+
+# Columnas numéricas que se convierten en el paso 2
+NUMERIC_COLS = ['passengers', 'sales', 'lost_sales', 'item_code']
+
+# Campos de cada registro de métricas por paso
+METRIC_FIELDS = ['file', 'step', 'calls', 'wall_s', 'cpu_s', 'peak_mem_delta_bytes',
+                 'rows_in', 'rows_out', 'bytes_in', 'bytes_out']
+
+
+def row_fingerprints(df):
+    """Calcula un hash de 64 bits por fila, independiente del índice.
+
+    Cada columna se lleva a una forma canónica antes del hash, para que una
+    misma fila produzca el mismo hash con cualquier lector (pyarrow, por
+    bloques o sin tipos): numéricas a float64, fechas a datetime64[ns] y
+    texto a object. Las category no se convierten porque hash_pandas_object
+    ya las hashea por el valor de cada categoría, igual que el texto.
+    """
+    canonical = {}
+    for col, dtype in df.dtypes.items():
+        if col in NUMERIC_COLS:
+            canonical[col] = 'float64'
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            canonical[col] = 'datetime64[ns]'
+        elif isinstance(dtype, pd.StringDtype):
+            canonical[col] = object
+    return pd.util.hash_pandas_object(df.astype(canonical), index=False).to_numpy()
+
+
+class RowFingerprints:
+    """Conjunto compacto de filas ya vistas (8 bytes por fila distinta)
+
+    Los hashes se guardan en corridas ordenadas y disjuntas de uint64, al
+    estilo de un LSM: cada bloque agrega una corrida con sus hashes nuevos y
+    las corridas de tamaño parecido se fusionan. Así agregar un bloque no
+    copia todo el conjunto y solo hay O(log n) corridas que consultar.
+    """
+
+    def __init__(self, initial=None):
+        self._runs = []
+        if initial is not None and len(initial):
+            self._runs.append(np.unique(initial))
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def seen(self, hashes):
+        """Máscara de los hashes que ya están en el conjunto"""
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            pos = np.searchsorted(run, hashes)
+            pos[pos == len(run)] = 0
+            found |= run[pos] == hashes
+        return found
+
+    def add(self, hashes):
+        """Registra los hashes y devuelve la máscara de filas nuevas (primera aparición)"""
+        unique, first = np.unique(hashes, return_index=True)
+        new = ~self.seen(unique)
+
+        is_new = np.zeros(len(hashes), dtype=bool)
+        is_new[first[new]] = True
+        if new.any():
+            self._runs.append(unique[new])
+            self._compact()
+        return is_new
+
+    def _compact(self):
+        # Fusionar mientras la corrida anterior no sea más del doble que la última
+        while len(self._runs) > 1 and len(self._runs[-2]) <= 2 * len(self._runs[-1]):
+            last, prev = self._runs.pop(), self._runs.pop()
+            # Las corridas son disjuntas y ya están ordenadas: basta un merge estable
+            self._runs.append(np.sort(np.concatenate([prev, last]), kind='stable'))
+
+
+class CrossFileDedup:
+    """Deduplicación entre archivos y bloques a medida que llegan los datos limpios
+
+    Solo conserva los hashes de las filas ya aceptadas, así que el dataset
+    combinado nunca se concatena ni se vuelve a recorrer para contar duplicados.
+    También cuenta los nulos de las filas aceptadas, para que el reporte de
+    calidad describa lo que realmente se escribió.
+    """
+
+    def __init__(self, initial=None):
+        self.seen = RowFingerprints(initial)
+        self.rows = 0
+        self.duplicates = 0
+        self.nulls = 0
+        self.columns = []
+
+    def filter(self, df):
+        """Devuelve las filas no vistas antes y sus hashes"""
+        hashes = row_fingerprints(df)
+        is_new = self.seen.add(hashes)
+        self.rows += int(is_new.sum())
+        self.duplicates += int((~is_new).sum())
+        self.columns = df.columns.tolist()
+        df = df[is_new]
+        self.nulls += int(df.isna().to_numpy().sum())
+        return df, hashes[is_new]
+
+    def duplicated_rows(self, previous_rows=0):
+        """Filas escritas repetidas: filas (incluidas `previous_rows` ya escritas) menos hashes distintos"""
+        return previous_rows + self.rows - len(self.seen)
+
+
+class CsvChunkWriter:
+    """Escribe bloques limpios de forma incremental en un CSV"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._write_header = True
+
+    def write(self, df):
+        df.to_csv(self.path, mode='w' if self._write_header else 'a',
+                  header=self._write_header, index=False)
+        self._write_header = False
+        self.rows += len(df)
+
+    def close(self):
+        if self._write_header:
+            # Ningún bloque sobrevivió la limpieza: dejar el archivo vacío
+            open(self.path, 'w', encoding='utf-8').close()
+
+
+def _mask(condition):
+    """Convierte una comparación de pandas en máscara numpy (NA cuenta como False)"""
+    return condition.to_numpy(dtype=bool, na_value=False)
+
+
+def print_header(name):
+    print(f"\n{'='*80}")
+    print(f"🧹 LIMPIANDO {name.upper()}")
+    print(f"{'='*80}")
 
 
 class DataCleaningPipeline:
     """Pipeline de limpieza de datos con reportes detallados"""
-    
-    def __init__(self):
+
+    def __init__(self, chunksize=None, verbose=True, fused=False):
         self.report = []
         self.initial_shape = None
         self.current_shape = None
-        
+        self.chunksize = chunksize
+        # Modo fusionado: los pasos 3-6 se evalúan como máscaras y se filtra una sola vez
+        self.fused = fused
+        # Métricas por paso (se acumulan entre bloques en modo streaming)
+        self.metrics = {}
+        # En los procesos del pool no se imprime: el proceso principal muestra el reporte
+        self.verbose = verbose
+
     def log(self, message):
         """Registra un mensaje en el reporte"""
-        print(f"  {message}")
+        if self.verbose:
+            print(f"  {message}")
         self.report.append(message)
-    
-    def step_1_normalize_columns(self, df):
-        """Paso 1: Normalizar nombres de columnas"""
-        self.log("✓ Paso 1: Normalizando nombres de columnas")
+
+    def _measure(self, step, func, df, *args, **kwargs):
+        """Ejecuta una transformación registrando tiempo, CPU, memoria y filas/bytes
+
+        La memoria pico y los bytes de entrada/salida solo se miden si
+        tracemalloc está activo (--profile): memory_usage(deep=True) recorre
+        todos los textos y tracemalloc encarece cada asignación de pandas.
+        """
+        tracing = tracemalloc.is_tracing()
+        rows_in = len(df)
+        bytes_in = int(df.memory_usage(deep=True).sum()) if tracing else None
+        if tracing:
+            tracemalloc.reset_peak()
+            mem_start = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+
+        result = func(df, *args, **kwargs)
+
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        peak = tracemalloc.get_traced_memory()[1] - mem_start if tracing else None
+        out = result[0] if isinstance(result, tuple) else result
+
+        m = self.metrics.setdefault(step, {'step': step, 'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0,
+                                           'peak_mem_delta_bytes': None, 'rows_in': 0, 'rows_out': 0,
+                                           'bytes_in': None, 'bytes_out': None})
+        m['calls'] += 1
+        m['wall_s'] += wall
+        m['cpu_s'] += cpu
+        if peak is not None:
+            m['peak_mem_delta_bytes'] = max(m['peak_mem_delta_bytes'] or 0, peak)
+        m['rows_in'] += rows_in
+        m['rows_out'] += len(out)
+        if tracing:
+            m['bytes_in'] = (m['bytes_in'] or 0) + bytes_in
+            m['bytes_out'] = (m['bytes_out'] or 0) + int(out.memory_usage(deep=True).sum())
+        return result
+
+    # ------------------------------------------------------------------
+    # Transformaciones de cada paso. Devuelven (df, estadísticas) para que el
+    # modo completo y el modo streaming compartan la lógica y el reporte.
+    # ------------------------------------------------------------------
+    def _normalize_columns(self, df):
         df.columns = df.columns.str.strip().str.lower().str.replace(' ', '_')
         return df
-    
-    def step_2_convert_types(self, df):
-        """Paso 2: Convertir tipos de datos"""
-        self.log("✓ Paso 2: Convirtiendo tipos de datos")
-        
+
+    def _convert_types(self, df):
         # Convertir fecha a datetime
         df['fecha'] = pd.to_datetime(df['fecha'], errors='coerce')
-        
+
         # Convertir columnas numéricas
-        numeric_cols = ['passengers', 'sales', 'lost_sales', 'item_code']
-        for col in numeric_cols:
+        for col in NUMERIC_COLS:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
-        
+
         return df
-    
-    def step_3_remove_duplicates(self, df):
-        """Paso 3: Eliminar duplicados"""
+
+    def _remove_duplicates(self, df, seen=None):
         initial_rows = len(df)
-        df = df.drop_duplicates()
-        removed = initial_rows - len(df)
-        
-        if removed > 0:
-            self.log(f"✓ Paso 3: Eliminados {removed} registros duplicados")
+        if seen is None:
+            df = df.drop_duplicates()
         else:
-            self.log("✓ Paso 3: No se encontraron duplicados")
-        
-        return df
-    
-    def step_4_remove_invalid_values(self, df):
-        """Paso 4: Eliminar valores inválidos (negativos donde no deben existir)"""
+            df = df[seen.add(row_fingerprints(df))]
+        return df, {'removed': initial_rows - len(df)}
+
+    def _remove_invalid_values(self, df):
         initial_rows = len(df)
-        
+        stats = {'invalid_passengers': 0, 'invalid_sales': 0}
+
         # Eliminar pasajeros negativos
         if 'passengers' in df.columns:
-            invalid_passengers = (df['passengers'] < 0).sum()
+            stats['invalid_passengers'] = int((df['passengers'] < 0).sum())
             df = df[df['passengers'] >= 0]
-            if invalid_passengers > 0:
-                self.log(f"  - Eliminados {invalid_passengers} registros con pasajeros negativos")
-        
+
         # Eliminar sales negativos (pueden ser devoluciones, pero los eliminaremos)
         if 'sales' in df.columns:
-            invalid_sales = (df['sales'] < 0).sum()
+            stats['invalid_sales'] = int((df['sales'] < 0).sum())
             df = df[df['sales'] >= 0]
-            if invalid_sales > 0:
-                self.log(f"  - Eliminados {invalid_sales} registros con ventas negativas")
-        
-        total_removed = initial_rows - len(df)
-        self.log(f"✓ Paso 4: Total de registros inválidos eliminados: {total_removed}")
-        
-        return df
-    
-    def step_5_drop_nulls(self, df):
-        """Paso 5: Eliminar filas con valores nulos"""
+
+        stats['removed'] = initial_rows - len(df)
+        return df, stats
+
+    def _drop_nulls(self, df):
         initial_rows = len(df)
-        
-        # Reportar nulos antes de eliminar
         null_counts = df.isnull().sum()
-        cols_with_nulls = null_counts[null_counts > 0]
-        
+
+        # Eliminar todas las filas con al menos un valor nulo
+        df = df.dropna()
+
+        return df, {'rows': initial_rows, 'null_counts': null_counts,
+                    'removed': initial_rows - len(df)}
+
+    def _validate_data(self, df):
+        stats = {'total_nulls': int(df.isnull().sum().sum())}
+        for col in ['passengers', 'sales', 'fecha']:
+            if col in df.columns:
+                stats[col] = (df[col].min(), df[col].max()) if len(df) else None
+        return df, stats
+
+    def _apply_fused_rules(self, df, seen=None):
+        """Pasos 3-6 en una sola pasada vectorizada
+
+        Cada regla de rechazo se evalúa como máscara booleana sobre el mismo
+        DataFrame y se materializa un único subconjunto al final. Los conteos
+        por regla se calculan sobre las filas que seguían vivas en ese punto,
+        así que coinciden exactamente con los de los pasos por separado.
+        """
+        initial_rows = len(df)
+        if seen is None:
+            alive = ~df.duplicated().to_numpy()
+        else:
+            alive = seen.add(row_fingerprints(df))
+        dups = {'removed': initial_rows - int(alive.sum())}
+
+        # Paso 4: valores negativos (un NaN tampoco pasa el filtro >= 0)
+        rows_before_invalid = int(alive.sum())
+        invalid = {'invalid_passengers': 0, 'invalid_sales': 0}
+        for col, key in [('passengers', 'invalid_passengers'), ('sales', 'invalid_sales')]:
+            if col in df.columns:
+                invalid[key] = int((alive & _mask(df[col] < 0)).sum())
+                alive &= _mask(df[col] >= 0)
+        invalid['removed'] = rows_before_invalid - int(alive.sum())
+
+        # Paso 5: nulos contados sobre las filas que sobrevivieron al paso 4
+        nulls = df.isnull().to_numpy()
+        rows_before_nulls = int(alive.sum())
+        null_counts = pd.Series(nulls[alive].sum(axis=0), index=df.columns)
+        alive &= ~nulls.any(axis=1)
+        null_stats = {'rows': rows_before_nulls, 'null_counts': null_counts,
+                      'removed': rows_before_nulls - int(alive.sum())}
+
+        # Único filtrado del DataFrame
+        df = df[alive]
+
+        # Paso 6: sin nulos por construcción; solo se recorren las columnas de rango
+        validation = {'total_nulls': 0}
+        for col in ['passengers', 'sales', 'fecha']:
+            if col in df.columns:
+                validation[col] = (df[col].min(), df[col].max()) if len(df) else None
+
+        return df, (dups, invalid, null_stats, validation)
+
+    # ------------------------------------------------------------------
+    # Mensajes del reporte de cada paso
+    # ------------------------------------------------------------------
+    def _report_duplicates(self, stats):
+        if stats['removed'] > 0:
+            self.log(f"✓ Paso 3: Eliminados {stats['removed']} registros duplicados")
+        else:
+            self.log("✓ Paso 3: No se encontraron duplicados")
+
+    def _report_invalid_values(self, stats):
+        if stats['invalid_passengers'] > 0:
+            self.log(f"  - Eliminados {stats['invalid_passengers']} registros con pasajeros negativos")
+        if stats['invalid_sales'] > 0:
+            self.log(f"  - Eliminados {stats['invalid_sales']} registros con ventas negativas")
+        self.log(f"✓ Paso 4: Total de registros inválidos eliminados: {stats['removed']}")
+
+    def _report_nulls(self, stats):
+        # Reportar nulos antes de eliminar
+        cols_with_nulls = stats['null_counts'][stats['null_counts'] > 0]
+
         if len(cols_with_nulls) > 0:
             self.log("  Columnas con valores nulos antes de limpiar:")
             for col, count in cols_with_nulls.items():
-                percentage = (count / len(df)) * 100
+                percentage = (count / stats['rows']) * 100
                 self.log(f"    - {col}: {count} ({percentage:.2f}%)")
-        
-        # Eliminar todas las filas con al menos un valor nulo
-        df = df.dropna()
-        
-        removed = initial_rows - len(df)
-        self.log(f"✓ Paso 5: Eliminadas {removed} filas con valores nulos")
-        
+
+        self.log(f"✓ Paso 5: Eliminadas {stats['removed']} filas con valores nulos")
+
+    def _report_steps_3_to_6(self, dups, invalid, nulls, validation):
+        self._report_duplicates(dups)
+        self._report_invalid_values(invalid)
+        self._report_nulls(nulls)
+        self.log("✓ Paso 6: Validando datos limpios")
+        self._report_validation(validation)
+
+    def _report_validation(self, stats):
+        # Verificar que no hay nulos
+        self.log(f"  - Total de valores nulos: {stats['total_nulls']}")
+
+        # Verificar rangos de datos importantes
+        if stats.get('passengers'):
+            self.log(f"  - Pasajeros: min={stats['passengers'][0]}, max={stats['passengers'][1]}")
+
+        if stats.get('sales'):
+            self.log(f"  - Ventas: min={stats['sales'][0]}, max={stats['sales'][1]}")
+
+        if stats.get('fecha'):
+            self.log(f"  - Rango de fechas: {stats['fecha'][0]} a {stats['fecha'][1]}")
+
+    # ------------------------------------------------------------------
+    # Pasos de la pipeline
+    # ------------------------------------------------------------------
+    def step_1_normalize_columns(self, df):
+        """Paso 1: Normalizar nombres de columnas"""
+        self.log("✓ Paso 1: Normalizando nombres de columnas")
+        return self._measure('step_1_normalize_columns', self._normalize_columns, df)
+
+    def step_2_convert_types(self, df):
+        """Paso 2: Convertir tipos de datos"""
+        self.log("✓ Paso 2: Convirtiendo tipos de datos")
+        return self._measure('step_2_convert_types', self._convert_types, df)
+
+    def step_3_remove_duplicates(self, df):
+        """Paso 3: Eliminar duplicados"""
+        df, stats = self._measure('step_3_remove_duplicates', self._remove_duplicates, df)
+        self._report_duplicates(stats)
+        return df
+
+    def step_4_remove_invalid_values(self, df):
+        """Paso 4: Eliminar valores inválidos (negativos donde no deben existir)"""
+        df, stats = self._measure('step_4_remove_invalid_values', self._remove_invalid_values, df)
+        self._report_invalid_values(stats)
         return df
-    
+
+    def step_5_drop_nulls(self, df):
+        """Paso 5: Eliminar filas con valores nulos"""
+        df, stats = self._measure('step_5_drop_nulls', self._drop_nulls, df)
+        self._report_nulls(stats)
+        return df
+
     def step_6_validate_data(self, df):
         """Paso 6: Validaciones adicionales y estadísticas finales"""
         self.log("✓ Paso 6: Validando datos limpios")
-        
-        # Verificar que no hay nulos
-        total_nulls = df.isnull().sum().sum()
-        self.log(f"  - Total de valores nulos: {total_nulls}")
-        
-        # Verificar rangos de datos importantes
-        if 'passengers' in df.columns:
-            self.log(f"  - Pasajeros: min={df['passengers'].min()}, max={df['passengers'].max()}")
-        
-        if 'sales' in df.columns:
-            self.log(f"  - Ventas: min={df['sales'].min()}, max={df['sales'].max()}")
-        
-        if 'fecha' in df.columns:
-            self.log(f"  - Rango de fechas: {df['fecha'].min()} a {df['fecha'].max()}")
-        
+        df, stats = self._measure('step_6_validate_data', self._validate_data, df)
+        self._report_validation(stats)
         return df
-    
+
+    def _print_header(self, name):
+        if self.verbose:
+            print_header(name)
+
+    def _log_summary(self):
+        rows_removed = self.initial_shape[0] - self.current_shape[0]
+        percentage_kept = (self.current_shape[0] / self.initial_shape[0]) * 100
+
+        self.log(f"\nDimensiones finales: {self.current_shape[0]} filas x {self.current_shape[1]} columnas")
+        self.log(f"Filas eliminadas: {rows_removed} ({100-percentage_kept:.2f}%)")
+        self.log(f"Filas conservadas: {self.current_shape[0]} ({percentage_kept:.2f}%)")
+
     def clean(self, df, name="Dataset"):
         """Ejecuta la pipeline completa de limpieza"""
         self.report = []
+        self.metrics = {}
         self.initial_shape = df.shape
-        
-        print(f"\n{'='*80}")
-        print(f"🧹 LIMPIANDO {name.upper()}")
-        print(f"{'='*80}")
+
+        self._print_header(name)
         self.log(f"Dimensiones iniciales: {df.shape[0]} filas x {df.shape[1]} columnas")
-        
+
         # Ejecutar pipeline
         df = self.step_1_normalize_columns(df)
         df = self.step_2_convert_types(df)
-        df = self.step_3_remove_duplicates(df)
-        df = self.step_4_remove_invalid_values(df)
-        df = self.step_5_drop_nulls(df)
-        df = self.step_6_validate_data(df)
-        
+        if self.fused:
+            df, stats = self._measure('steps_3_6_fused', self._apply_fused_rules, df)
+            self._report_steps_3_to_6(*stats)
+        else:
+            df = self.step_3_remove_duplicates(df)
+            df = self.step_4_remove_invalid_values(df)
+            df = self.step_5_drop_nulls(df)
+            df = self.step_6_validate_data(df)
+
         self.current_shape = df.shape
-        rows_removed = self.initial_shape[0] - self.current_shape[0]
-        percentage_kept = (self.current_shape[0] / self.initial_shape[0]) * 100
-        
-        self.log(f"\nDimensiones finales: {df.shape[0]} filas x {df.shape[1]} columnas")
-        self.log(f"Filas eliminadas: {rows_removed} ({100-percentage_kept:.2f}%)")
-        self.log(f"Filas conservadas: {self.current_shape[0]} ({percentage_kept:.2f}%)")
-        
+        self._log_summary()
+
         return df
-    
+
+    def clean_chunks(self, chunks, name="Dataset", on_chunk=None):
+        """Ejecuta la pipeline bloque a bloque (modo streaming)
+
+        Cada bloque pasa por los pasos 1-6 y se entrega a `on_chunk` en cuanto
+        está limpio, de modo que nunca se mantiene el archivo completo en memoria.
+        Las estadísticas de cada paso se acumulan y el reporte resultante es el
+        mismo que produciría `clean` sobre el archivo completo.
+        """
+        self.report = []
+        self.metrics = {}
+        self._print_header(name)
+
+        seen = RowFingerprints()
+        rows_in, rows_out, n_cols, out_cols = 0, 0, 0, 0
+        dups = {'removed': 0}
+        invalid = {'invalid_passengers': 0, 'invalid_sales': 0, 'removed': 0}
+        nulls = {'rows': 0, 'null_counts': None, 'removed': 0}
+        validation = {'total_nulls': 0}
+
+        for i, chunk in enumerate(chunks, start=1):
+            rows_in += len(chunk)
+            n_cols = chunk.shape[1]
+
+            chunk = self._measure('step_1_normalize_columns', self._normalize_columns, chunk)
+            chunk = self._measure('step_2_convert_types', self._convert_types, chunk)
+
+            if self.fused:
+                chunk, (s3, s4, s5, s6) = self._measure('steps_3_6_fused', self._apply_fused_rules,
+                                                        chunk, seen=seen)
+            else:
+                chunk, s3 = self._measure('step_3_remove_duplicates', self._remove_duplicates, chunk, seen=seen)
+                chunk, s4 = self._measure('step_4_remove_invalid_values', self._remove_invalid_values, chunk)
+                chunk, s5 = self._measure('step_5_drop_nulls', self._drop_nulls, chunk)
+                chunk, s6 = self._measure('step_6_validate_data', self._validate_data, chunk)
+
+            dups['removed'] += s3['removed']
+            for key in invalid:
+                invalid[key] += s4[key]
+
+            nulls['rows'] += s5['rows']
+            nulls['removed'] += s5['removed']
+            nulls['null_counts'] = (s5['null_counts'] if nulls['null_counts'] is None
+                                    else nulls['null_counts'].add(s5['null_counts'], fill_value=0))
+
+            validation['total_nulls'] += s6['total_nulls']
+            for col in ['passengers', 'sales', 'fecha']:
+                if s6.get(col):
+                    prev = validation.get(col)
+                    validation[col] = s6[col] if prev is None else (
+                        min(prev[0], s6[col][0]), max(prev[1], s6[col][1]))
+
+            rows_out += len(chunk)
+            out_cols = chunk.shape[1]
+            if self.verbose:
+                print(f"  · Bloque {i}: {rows_in:,} filas leídas, {rows_out:,} conservadas")
+            if on_chunk is not None:
+                on_chunk(chunk)
+
+        if nulls['null_counts'] is None:
+            nulls['null_counts'] = pd.Series(dtype='int64')
+        nulls['null_counts'] = nulls['null_counts'].astype('int64')
+
+        # Emitir el reporte en el mismo orden que el modo completo
+        self.initial_shape = (rows_in, n_cols)
+        self.current_shape = (rows_out, out_cols)
+        self.log(f"Dimensiones iniciales: {rows_in} filas x {n_cols} columnas")
+        self.log("✓ Paso 1: Normalizando nombres de columnas")
+        self.log("✓ Paso 2: Convirtiendo tipos de datos")
+        self._report_steps_3_to_6(dups, invalid, nulls, validation)
+        self._log_summary()
+
+    def clean_file(self, path, name="Dataset", on_chunk=None):
+        """Limpia un CSV crudo en modo streaming leyendo bloques de `chunksize` filas"""
+        self.clean_chunks(read_raw_csv(path, chunksize=self.chunksize), name, on_chunk=on_chunk)
+
     def get_report(self):
         """Retorna el reporte completo"""
         return "\n".join(self.report)
 
+    def get_metrics(self, name="Dataset"):
+        """Retorna las métricas por paso de la última limpieza como lista de registros"""
+        return [{'file': name, **m} for m in self.metrics.values()]
+
 
-# Ejecutar pipeline
-print("=" * 80)
-print("🚀 INICIANDO PIPELINE DE LIMPIEZA DE DATOS")
-print("=" * 80)
-print(f"Fecha de ejecución: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-# Crear instancia del pipeline
-pipeline = DataCleaningPipeline()
-
-# Cargar y limpiar archivo A
-print("📂 Cargando archivo A...")
-df_a = pd.read_csv(file_a)
-df_a_clean = pipeline.clean(df_a, "Archivo A")
-report_a = pipeline.get_report()
-
-# Cargar y limpiar archivo B
-print("\n📂 Cargando archivo B...")
-df_b = pd.read_csv(file_b)
-df_b_clean = pipeline.clean(df_b, "Archivo B")
-report_b = pipeline.get_report()
-
-# Combinar archivos limpios
-print("\n" + "=" * 80)
-print("🔗 COMBINANDO ARCHIVOS LIMPIOS")
-print("=" * 80)
-df_combined = pd.concat([df_a_clean, df_b_clean], ignore_index=True)
-print(f"Dimensiones del dataset combinado: {df_combined.shape[0]} filas x {df_combined.shape[1]} columnas")
-
-# Verificar y eliminar duplicados después de combinar
-duplicates_combined = df_combined.duplicated().sum()
-if duplicates_combined > 0:
-    print(f"Eliminando {duplicates_combined} duplicados entre archivos...")
-    df_combined = df_combined.drop_duplicates()
-    print(f"Dimensiones finales: {df_combined.shape[0]} filas x {df_combined.shape[1]} columnas")
-
-# Guardar archivo combinado
-print("\n" + "=" * 80)
-print("💾 GUARDANDO DATOS LIMPIOS")
-print("=" * 80)
-df_combined.to_csv(output_combined, index=False)
-print(f"✅ Archivo combinado guardado en: {output_combined}")
-
-# Generar reporte completo
-full_report = f"""
+def build_report(sections, n_rows, columns, duplicates_combined, total_nulls, total_duplicated, outputs):
+    """Arma el texto de cleaning_report.txt"""
+    body = "\n\n".join(f"{title}:\n{report}" for title, report in sections)
+    return f"""
 REPORTE DE LIMPIEZA DE DATOS
 {'='*80}
 Fecha de ejecución: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
-ARCHIVO A:
-{report_a}
-
-ARCHIVO B:
-{report_b}
+{body}
 
 DATASET COMBINADO FINAL:
-- Total de filas: {df_combined.shape[0]}
-- Total de columnas: {df_combined.shape[1]}
+- Total de filas: {n_rows}
+- Total de columnas: {len(columns)}
 - Duplicados entre archivos eliminados: {duplicates_combined}
-- Archivo guardado: {output_combined}
+- Archivo guardado: {', '.join(outputs)}
 
 COLUMNAS FINALES:
-{', '.join(df_combined.columns.tolist())}
+{', '.join(columns)}
 
 RESUMEN DE CALIDAD:
-- Valores nulos: {df_combined.isnull().sum().sum()}
-- Filas duplicadas: {df_combined.duplicated().sum()}
-- Integridad de datos: ✅ VERIFICADA
+- Valores nulos: {total_nulls}
+- Filas duplicadas: {total_duplicated}
+- Integridad de datos: {'✅ VERIFICADA' if total_nulls == 0 and total_duplicated == 0 else '⚠️ REVISAR'}
 """
 
-# Guardar reporte
-with open(output_report, 'w', encoding='utf-8') as f:
-    f.write(full_report)
 
-print(f"📄 Reporte guardado en: {output_report}")
+def make_writers(fmt):
+    """Crea los escritores de salida según el formato pedido (csv, parquet o both)"""
+    writers = []
+    if fmt in ('csv', 'both'):
+        writers.append(CsvChunkWriter(output_combined))
+    if fmt in ('parquet', 'both'):
+        writers.append(ParquetPartitionWriter(output_parquet))
+    return writers
+
+
+def print_section(title, report):
+    """Muestra el reporte de un archivo limpiado en otro proceso"""
+    print_header(title)
+    for line in report.splitlines():
+        print(f"  {line}")
+
+
+def run_tasks(task, args_list, workers):
+    """Ejecuta `task` para cada archivo y entrega los resultados en el orden de entrada
+
+    Con más de un worker cada archivo se limpia en un proceso del pool; los
+    resultados se consumen en orden para que el combinado sea determinista.
+    """
+    if workers <= 1 or len(args_list) <= 1:
+        for args in args_list:
+            yield task(*args)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(args_list))) as pool:
+        futures = [pool.submit(task, *args) for args in args_list]
+        for future in futures:
+            yield future.result()
+
+
+def clean_file_task(title, path, verbose=False, fused=False, profile=False):
+    """Tarea del pool: carga y limpia un archivo completo"""
+    if profile and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    pipeline = DataCleaningPipeline(verbose=verbose, fused=fused)
+    if verbose:
+        print(f"📂 Cargando {title.lower()}...")
+    df = pipeline.clean(read_raw_csv(path), title)
+    return df, pipeline.get_report(), pipeline.initial_shape[0], pipeline.get_metrics(title)
+
+
+def clean_file_to_spool_task(title, path, chunksize, spool_dir, fused=False, profile=False):
+    """Tarea del pool: limpia un archivo por bloques y los deja en `spool_dir`
+
+    Cada bloque limpio se guarda como pickle (conserva los dtypes exactos) para
+    que el proceso principal los combine en orden sin cargar el archivo entero.
+    """
+    if profile and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    pipeline = DataCleaningPipeline(chunksize=chunksize, verbose=False, fused=fused)
+    spool = []
+
+    def spill(chunk):
+        chunk_path = os.path.join(spool_dir, f"chunk-{len(spool):05d}.pkl")
+        chunk.to_pickle(chunk_path)
+        spool.append(chunk_path)
+
+    pipeline.clean_file(path, title, on_chunk=spill)
+    return spool, pipeline.get_report(), pipeline.initial_shape[0], pipeline.get_metrics(title)
+
+
+def clean_files(files, on_chunk, chunksize=None, workers=1, fused=False, profile=False):
+    """Limpia cada archivo y entrega sus bloques limpios en el orden de entrada
+
+    Sin `chunksize` cada archivo se carga completo (un único bloque); con
+    `chunksize` se procesa en modo streaming. Con varios workers los archivos
+    se limpian en paralelo y los bloques se reproducen en orden al terminar.
+    Llama `on_chunk(i, chunk)` con el índice del archivo y devuelve la lista de
+    (reporte, filas leídas, métricas por paso) de cada archivo.
+    """
+    results = []
+    serial = workers <= 1 or len(files) <= 1
+
+    if chunksize:
+        print(f"⚙️ Modo streaming: bloques de {chunksize:,} filas")
+    if not serial:
+        print(f"⚙️ Limpiando {len(files)} archivos en paralelo ({min(workers, len(files))} procesos)")
+
+    if not chunksize:
+        tasks = [(title, path, serial, fused, profile) for title, path in files]
+        for i, ((title, _), (df, report, rows, metrics)) in enumerate(
+                zip(files, run_tasks(clean_file_task, tasks, workers))):
+            if not serial:
+                print_section(title, report)
+            on_chunk(i, df)
+            results.append((report, rows, metrics))
+            print()
+    elif serial:
+        pipeline = DataCleaningPipeline(chunksize=chunksize, fused=fused)
+        for i, (title, path) in enumerate(files):
+            print(f"📂 Procesando {title.lower()} por bloques...")
+            pipeline.clean_file(path, title, on_chunk=lambda chunk: on_chunk(i, chunk))
+            results.append((pipeline.get_report(), pipeline.initial_shape[0], pipeline.get_metrics(title)))
+            print()
+    else:
+        spool_root = tempfile.mkdtemp(prefix='clean_data_')
+        try:
+            tasks = []
+            for i, (title, path) in enumerate(files):
+                spool_dir = os.path.join(spool_root, f"{i:04d}")
+                os.makedirs(spool_dir)
+                tasks.append((title, path, chunksize, spool_dir, fused, profile))
+
+            for i, ((title, _), (spool, report, rows, metrics)) in enumerate(
+                    zip(files, run_tasks(clean_file_to_spool_task, tasks, workers))):
+                print_section(title, report)
+                for chunk_path in spool:
+                    on_chunk(i, pd.read_pickle(chunk_path))
+                    os.remove(chunk_path)
+                results.append((report, rows, metrics))
+                print()
+        finally:
+            shutil.rmtree(spool_root, ignore_errors=True)
+
+    return results
+
+
+def run_in_memory(files, fmt='both', workers=1, fused=False, profile=False):
+    """Carga cada archivo completo, lo limpia y lo agrega al resultado combinado
+
+    Cada archivo se escribe en cuanto termina su limpieza; los duplicados entre
+    archivos se descartan con los hashes de las filas ya escritas, sin
+    concatenar el dataset combinado.
+    """
+    writers = make_writers(fmt)
+    dedup = CrossFileDedup()
+
+    def write_file(i, df):
+        df, _ = dedup.filter(df)
+        for writer in writers:
+            writer.write(df)
+
+    results = clean_files(files, write_file, workers=workers, fused=fused, profile=profile)
+    sections = [(title.upper(), report) for (title, _), (report, _, _) in zip(files, results)]
+    rows_read = sum(rows for _, rows, _ in results)
+
+    # Combinar archivos limpios
+    print("=" * 80)
+    print("🔗 COMBINANDO ARCHIVOS LIMPIOS")
+    print("=" * 80)
+    n_cols = len(dedup.columns)
+    print(f"Dimensiones del dataset combinado: {dedup.rows + dedup.duplicates} filas x {n_cols} columnas")
+    if dedup.duplicates > 0:
+        print(f"Eliminados {dedup.duplicates} duplicados entre archivos")
+        print(f"Dimensiones finales: {dedup.rows} filas x {n_cols} columnas")
+
+    # Guardar archivo combinado
+    print("\n" + "=" * 80)
+    print("💾 GUARDANDO DATOS LIMPIOS")
+    print("=" * 80)
+    for writer in writers:
+        writer.close()
+        print(f"✅ Datos limpios guardados en: {writer.path}")
+
+    # Nulos y duplicados contados sobre las filas escritas
+    report = build_report(sections, dedup.rows, dedup.columns, dedup.duplicates, dedup.nulls,
+                          dedup.duplicated_rows(), [w.path for w in writers])
+    return report, rows_read, dedup.rows, [m for _, _, metrics in results for m in metrics]
+
+
+def run_streaming(files, chunksize, fmt='both', workers=1, fused=False, profile=False):
+    """Limpia cada archivo por bloques y escribe el resultado de forma incremental
+
+    Los duplicados entre archivos se detectan con los hashes de las filas ya
+    escritas, sin volver a cargar el dataset combinado.
+    """
+    writers = make_writers(fmt)
+    dedup = CrossFileDedup()
+
+    def write_chunk(i, chunk):
+        chunk, _ = dedup.filter(chunk)
+        for writer in writers:
+            writer.write(chunk)
+
+    results = clean_files(files, write_chunk, chunksize, workers, fused, profile)
+    sections = [(title.upper(), report) for (title, _), (report, _, _) in zip(files, results)]
+    rows_read = sum(rows for _, rows, _ in results)
+
+    print("=" * 80)
+    print("💾 DATOS LIMPIOS GUARDADOS DE FORMA INCREMENTAL")
+    print("=" * 80)
+    if dedup.duplicates > 0:
+        print(f"Eliminados {dedup.duplicates} duplicados entre archivos")
+    for writer in writers:
+        writer.close()
+        print(f"✅ Datos limpios guardados en: {writer.path} ({dedup.rows} filas)")
+
+    # Nulos y duplicados contados sobre las filas escritas
+    report = build_report(sections, dedup.rows, dedup.columns, dedup.duplicates, dedup.nulls,
+                          dedup.duplicated_rows(), [w.path for w in writers])
+    return report, rows_read, dedup.rows, [m for _, _, metrics in results for m in metrics]
+
+
+def run_incremental(files, chunksize=None, workers=1, fused=False, profile=False):
+    """Limpia solo los archivos nuevos o modificados y agrega sus particiones
+
+    El manifiesto guarda el hash de cada archivo ya procesado; los que no
+    cambiaron se saltan y su sección del reporte se reutiliza. La deduplicación
+    entre archivos parte de los hashes de filas ya escritos por los archivos
+    conservados, así que el dataset resultante es el mismo que el de una
+    corrida completa.
+    """
+    manifest = CleaningManifest()
+    if not len(manifest) and os.path.isdir(output_parquet):
+        # Sin manifiesto no se sabe qué archivo aportó cada partición: empezar de cero
+        shutil.rmtree(output_parquet)
+
+    print("🔎 Calculando hashes de los archivos crudos...")
+    hashes = {path: file_sha256(path) for _, path in files}
+    keep, todo = manifest.plan(files, hashes)
+    print(f"   - Archivos sin cambios: {len(keep)}")
+    print(f"   - Archivos a limpiar: {len(todo)}")
+
+    # Retirar lo que aportaron los archivos que se van a limpiar de nuevo
+    for _, path in todo:
+        if path in manifest.files:
+            remove_parts(manifest.files[path]['file_id'], output_parquet)
+            manifest.forget(path)
+
+    dedup = CrossFileDedup(manifest.fingerprints(keep))
+    writers = [ParquetPartitionWriter(output_parquet, append=True, prefix=file_id(path)) for _, path in todo]
+    added = [{'rows': 0, 'duplicates': 0, 'nulls': 0, 'fingerprints': []} for _ in todo]
+
+    def write_chunk(i, chunk):
+        rows, duplicates, nulls = dedup.rows, dedup.duplicates, dedup.nulls
+        chunk, hashes_chunk = dedup.filter(chunk)
+        added[i]['duplicates'] += dedup.duplicates - duplicates
+        added[i]['rows'] += dedup.rows - rows
+        added[i]['nulls'] += dedup.nulls - nulls
+        added[i]['fingerprints'].append(hashes_chunk)
+        manifest.columns = dedup.columns
+        writers[i].write(chunk)
+
+    results = clean_files(todo, write_chunk, chunksize, workers, fused, profile) if todo else []
+
+    for (title, path), (report, rows, _), state in zip(todo, results, added):
+        manifest.record(path, {
+            'title': title,
+            'file_id': file_id(path),
+            'sha256': hashes[path],
+            'rows': rows,
+            'rows_clean': state['rows'],
+            'duplicates': state['duplicates'],
+            'nulls': state['nulls'],
+            'report': report,
+        }, np.concatenate(state['fingerprints']) if state['fingerprints'] else np.empty(0, dtype=np.uint64))
+    manifest.save()
+
+    entries = list(manifest.files.values())
+    n_rows = sum(entry['rows_clean'] for entry in entries)
+    duplicates = sum(entry['duplicates'] for entry in entries)
+
+    print("=" * 80)
+    print("💾 PARTICIONES AGREGADAS AL DATASET")
+    print("=" * 80)
+    if not todo:
+        print("✅ Sin cambios en los archivos crudos: el dataset ya está al día")
+    print(f"✅ Dataset Parquet en: {output_parquet} ({n_rows} filas)")
+
+    # Nulos y duplicados de todo el dataset: los de los archivos conservados vienen del manifiesto
+    kept_rows = sum(manifest.files[path]['rows_clean'] for path in keep)
+    report = build_report([(entry['title'].upper(), entry['report']) for entry in entries],
+                          n_rows, manifest.columns, duplicates, sum(entry['nulls'] for entry in entries),
+                          dedup.duplicated_rows(kept_rows), [output_parquet])
+    return (report, sum(rows for _, rows, _ in results), sum(state['rows'] for state in added),
+            [m for _, _, metrics in results for m in metrics])
+
+
+def write_metrics(metrics, run_info):
+    """Guarda las métricas por paso en JSON (con datos de la corrida) y en CSV"""
+    with open(output_metrics_json, 'w', encoding='utf-8') as f:
+        json.dump({'run': run_info, 'steps': metrics}, f, ensure_ascii=False, indent=2)
+    with open(output_metrics_csv, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=METRIC_FIELDS)
+        writer.writeheader()
+        writer.writerows(metrics)
+
+
+def print_metrics_summary(metrics):
+    """Imprime una tabla con el total por paso de todos los archivos"""
+    totals = {}
+    for m in metrics:
+        t = totals.setdefault(m['step'], {'wall_s': 0.0, 'cpu_s': 0.0, 'peak': None,
+                                          'rows_in': 0, 'rows_out': 0, 'bytes_in': None})
+        t['wall_s'] += m['wall_s']
+        t['cpu_s'] += m['cpu_s']
+        if m['peak_mem_delta_bytes'] is not None:
+            t['peak'] = max(t['peak'] or 0, m['peak_mem_delta_bytes'])
+        t['rows_in'] += m['rows_in']
+        t['rows_out'] += m['rows_out']
+        if m['bytes_in'] is not None:
+            t['bytes_in'] = (t['bytes_in'] or 0) + m['bytes_in']
+
+    total_wall = sum(t['wall_s'] for t in totals.values()) or 1.0
+    print("\n" + "=" * 80)
+    print("⏱️ MÉTRICAS POR PASO")
+    print("=" * 80)
+    print(f"{'Paso':<30}{'Wall (s)':>10}{'CPU (s)':>10}{'%':>7}{'Pico MB':>10}{'Filas in':>13}{'Filas out':>13}")
+    for step, t in totals.items():
+        peak = f"{t['peak'] / 1e6:.1f}" if t['peak'] is not None else '-'
+        print(f"{step:<30}{t['wall_s']:>10.3f}{t['cpu_s']:>10.3f}{t['wall_s'] / total_wall * 100:>6.1f}%"
+              f"{peak:>10}{t['rows_in']:>13,}{t['rows_out']:>13,}")
+
+
+def resolve_files(patterns):
+    """Expande rutas o patrones glob a la lista de (título, ruta) a limpiar"""
+    if not patterns:
+        return [("Archivo A", file_a), ("Archivo B", file_b)]
+
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for path in map(os.path.normpath, matches):
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"No se encontró el archivo de datos crudos: {path}")
+            if path not in [p for _, p in files]:
+                files.append((f"Archivo {os.path.basename(path)}", path))
+    return files
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline de limpieza de datos para GateGroup Airlines")
+    parser.add_argument('files', nargs='*',
+                        help="Archivos CSV crudos o patrones glob (por defecto los archivos A y B)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Procesar los archivos en bloques de N filas (memoria acotada por el tamaño del bloque)")
+    parser.add_argument('--format', choices=['csv', 'parquet', 'both'], default='both',
+                        help="Formato de salida: CSV combinado, Parquet particionado por mes o ambos")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Procesos para limpiar archivos en paralelo (1 = secuencial)")
+    parser.add_argument('--fused', action='store_true',
+                        help="Evaluar los pasos 3-6 como una sola máscara y filtrar una única vez")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Limpiar solo archivos nuevos o modificados según el manifiesto (salida Parquet)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Medir también la memoria pico por paso (tracemalloc) e imprimir la tabla de métricas")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("=" * 80)
+    print("🚀 INICIANDO PIPELINE DE LIMPIEZA DE DATOS")
+    print("=" * 80)
+    print(f"Fecha de ejecución: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+
+    files = resolve_files(args.files)
+    os.makedirs(os.path.dirname(output_combined) or '.', exist_ok=True)
+    if args.profile:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    if args.incremental:
+        full_report, rows_read, rows_clean, metrics = run_incremental(
+            files, args.chunksize, args.workers, args.fused, args.profile)
+    elif args.chunksize:
+        full_report, rows_read, rows_clean, metrics = run_streaming(
+            files, args.chunksize, args.format, args.workers, args.fused, args.profile)
+    else:
+        full_report, rows_read, rows_clean, metrics = run_in_memory(
+            files, args.format, args.workers, args.fused, args.profile)
+    if not args.incremental and args.format != 'csv':
+        # El Parquet se reescribió completo: el manifiesto anterior ya no aplica
+        CleaningManifest.clear()
+    if (args.incremental or args.format != 'csv') and features_are_stale():
+        # Las variables del dashboard se calculan aquí, una vez, y no en cada arranque
+        print("\n⚙️ Materializando variables derivadas para el dashboard...")
+        materialize_features()
+        print(f"✅ Variables guardadas en: {output_features}")
+    if os.path.isdir(output_features) and cube_is_stale():
+        # Cubo pre-agregado que usan los KPIs y gráficas del dashboard
+        print(f"✅ Cubo de ventas ({materialize_cube():,} celdas) guardado en: {output_cube}")
+    if os.path.isdir(output_features) and arrow_is_stale():
+        # Copia Arrow que el dashboard abre mapeada en memoria, compartida entre procesos
+        print(f"✅ Dataset compartido ({write_arrow(read_features()):,} filas) guardado en: {output_arrow}")
+
+    # Guardar reporte
+    with open(output_report, 'w', encoding='utf-8') as f:
+        f.write(full_report)
+
+    print(f"📄 Reporte guardado en: {output_report}")
+
+    write_metrics(metrics, {
+        'fecha_ejecucion': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'modo': 'incremental' if args.incremental else ('streaming' if args.chunksize else 'completo'),
+        'chunksize': args.chunksize,
+        'workers': args.workers,
+        'fused': args.fused,
+        'profile_memory': args.profile,
+        'archivos': [path for _, path in files],
+        'filas_leidas': rows_read,
+        'filas_limpias': rows_clean,
+        'wall_total_s': time.perf_counter() - started,
+    })
+    print(f"📄 Métricas por paso guardadas en: {output_metrics_json} y {output_metrics_csv}")
+    if args.profile:
+        print_metrics_summary(metrics)
+
+    print("\n" + "=" * 80)
+    print("🎉 ¡PIPELINE DE LIMPIEZA COMPLETADA EXITOSAMENTE!")
+    print("=" * 80)
+    print(f"\n📊 Resumen final:")
+    print(f"   - Registros totales procesados: {rows_read}")
+    print(f"   - Registros finales limpios: {rows_clean}")
+    if rows_read:
+        print(f"   - Tasa de retención: {(rows_clean / rows_read) * 100:.2f}%")
+
 
-print("\n" + "=" * 80)
-print("🎉 ¡PIPELINE DE LIMPIEZA COMPLETADA EXITOSAMENTE!")
-print("=" * 80)
-print(f"\n📊 Resumen final:")
-print(f"   - Registros totales procesados: {df_a.shape[0] + df_b.shape[0]}")
-print(f"   - Registros finales limpios: {df_combined.shape[0]}")
-print(f"   - Tasa de retención: {(df_combined.shape[0] / (df_a.shape[0] + df_b.shape[0])) * 100:.2f}%")
+if __name__ == '__main__':
+    main()
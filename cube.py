@@ -0,0 +1,158 @@
+"""
+Cubo pre-agregado de ventas para el dashboard de GateGroup Airlines
+Agrega las transacciones a día x ruta x item x aerolínea x warehouse (con categorías)
+
+Uso:
+    python cube.py    # materializa el cubo en Data/Clean/sales_cube.parquet
+"""
+import os
+import time
+import numpy as np
+import pandas as pd
+from dimensions import restore_dimensions, weekday_codes
+from features import output_features, read_features, sort_by_fecha
+from filter_index import DayIndex
+
+# Rutas
+output_cube = r'Data\Clean\sales_cube.parquet'
+
+# Grano del cubo. type_transaction se incluye porque es un filtro del sidebar;
+# ruta, categorías, clase de producto y rankings dependen de origen/destino o
+# del item, así que no agregan celdas y permiten filtrar y agrupar por ellos.
+CUBE_KEYS = ['fecha', 'origen', 'destino', 'ruta', 'item_code', 'nombre_de_aerolinea', 'warehouse',
+             'type_transaction', 'category', 'supercategory', 'product_category',
+             'item_sales_rank', 'item_freq_rank']
+
+# Medidas aditivas: se suman al consultar cualquier combinación de dimensiones
+CUBE_MEASURES = {
+    'sales': 'sum',
+    'passengers': 'sum',
+    'lost_sales': 'sum',
+    'duracion_vuelo_horas': 'sum',
+}
+COUNT_COL = 'transacciones'
+
+
+def build_cube(df):
+    """Agrega el dataset con variables (features) al grano del cubo
+
+    Además de las medidas guarda el número de transacciones de cada celda, con
+    el que se obtienen conteos y promedios exactos. `flight_key` no se agrega:
+    un vuelo aparece en muchas celdas y su conteo de distintos no es aditivo
+    (ver FlightCounter).
+    """
+    keys = [col for col in CUBE_KEYS if col in df.columns]
+    measures = {col: agg for col, agg in CUBE_MEASURES.items() if col in df.columns}
+    grouped = df.groupby(keys, observed=True, sort=False)
+    cube = grouped.agg(measures)
+    cube[COUNT_COL] = grouped.size()
+    cube = cube.reset_index()
+
+    # Variables de calendario del cubo (mismas definiciones que add_features)
+    cube['mes'] = cube['fecha'].dt.month
+    cube['dia'] = cube['fecha'].dt.day
+    cube['dia_semana'] = weekday_codes(cube['fecha'])
+    for col in ['ruta', 'product_category']:
+        if col in cube.columns and not isinstance(cube[col].dtype, pd.CategoricalDtype):
+            cube[col] = cube[col].astype('category')
+    return cube.sort_values('fecha', kind='stable').reset_index(drop=True)
+
+
+def materialize_cube(source=output_features, path=output_cube):
+    """Construye el cubo desde el Parquet de variables y lo guarda; devuelve el número de celdas"""
+    cube = build_cube(read_features(source))
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    cube.to_parquet(path, index=False)
+    return len(cube)
+
+
+def read_cube(path=output_cube):
+    return sort_by_fecha(restore_dimensions(pd.read_parquet(path)))
+
+
+def cube_is_stale(source=output_features, path=output_cube):
+    """True si falta el cubo o es más viejo que el Parquet de variables"""
+    if not os.path.isfile(path):
+        return True
+    source_mtime = max((os.path.getmtime(os.path.join(root, name))
+                        for root, _, names in os.walk(source) for name in names), default=0.0)
+    return source_mtime > os.path.getmtime(path)
+
+
+class SalesCube:
+    """Consultas del dashboard sobre el cubo
+
+    Las celdas están ordenadas por fecha: el rango de fechas es un intervalo
+    contiguo de celdas y los demás filtros del sidebar se aplican como máscaras
+    solo dentro de él. Los totales y agrupaciones se obtienen sumando las
+    medidas de las celdas seleccionadas.
+    """
+
+    def __init__(self, cube):
+        self.cube = sort_by_fecha(cube)
+        self.days = DayIndex(self.cube['fecha'])
+
+    def select(self, selections, date_range=None):
+        """Celdas que cumplen todos los filtros ({columna: valor}, None = todos)"""
+        cells = self.cube
+        if date_range is not None:
+            lo, hi = self.days.slice(*date_range)
+            cells = cells.iloc[lo:hi]
+        mask = None
+        for col, value in selections.items():
+            if value is not None:
+                match = (cells[col] == value).to_numpy(dtype=bool, na_value=False)
+                mask = match if mask is None else mask & match
+        return cells if mask is None else cells[mask]
+
+
+def totals(cells):
+    """Totales de las medidas y del número de transacciones de un conjunto de celdas"""
+    return cells[[col for col in [*CUBE_MEASURES, COUNT_COL] if col in cells.columns]].sum()
+
+
+def rollup(cells, by, measures=('sales',)):
+    """Suma de `measures` agrupada por `by` sobre las celdas seleccionadas"""
+    return cells.groupby(by, observed=True)[list(measures)].sum()
+
+
+class FlightCounter:
+    """Vuelos distintos (flight_key) de una selección de filas
+
+    Es la única métrica del dashboard que no se puede sumar desde el cubo. Cada
+    fila guarda el código entero de su vuelo y cada vuelo su ruta, de modo que
+    contar vuelos distintos de una selección es un bincount sobre sus filas.
+    """
+
+    def __init__(self, df):
+        self.codes, flights = pd.factorize(df['flight_key'])
+        self.codes = self.codes.astype(np.int32)
+        self.n_flights = len(flights)
+        # Código de ruta de cada vuelo (el de su primera fila; factorize numera en orden de aparición)
+        first_row = np.unique(self.codes, return_index=True)[1]
+        ruta = df['ruta'].astype('category')
+        self.route = ruta.cat.codes.to_numpy()[first_row]
+        self.route_labels = ruta.cat.categories
+
+    def _present(self, rows):
+        return np.bincount(self.codes[rows], minlength=self.n_flights) > 0
+
+    def count(self, rows):
+        """Número de vuelos distintos en las filas `rows` (posiciones)"""
+        return int(self._present(rows).sum())
+
+    def by_route(self, rows):
+        """Vuelos distintos por ruta en las filas `rows`"""
+        counts = np.bincount(self.route[self._present(rows)], minlength=len(self.route_labels))
+        return pd.Series(counts, index=self.route_labels)
+
+
+def main():
+    print("⚙️ Materializando cubo de ventas...")
+    started = time.perf_counter()
+    cells = materialize_cube()
+    print(f"✅ Cubo de {cells:,} celdas guardado en: {output_cube} ({time.perf_counter() - started:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,19 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from datetime import datetime, timedelta
+import os
 import warnings
+from agg_cache import AggregationCache, filter_key
+from chart_data import box_stats, downsample_line, histogram_bins, stratified_sample
+from cube import COUNT_COL, FlightCounter, SalesCube, build_cube, cube_is_stale, output_cube, read_cube, rollup, totals
+from features import add_features, features_are_stale
+from filter_index import FilterIndex
+from product_classes import FREQ_THRESHOLD, PRODUCT_CLASSES, SALES_THRESHOLD, classify_products, classify_rows
+from shared_data import load_shared
+from storage import output_parquet, read_clean_data
 warnings.filterwarnings('ignore')
 
 # Configuración de la página
@@ -132,74 +140,47 @@ with col_title2:
 st.markdown("---")
 
 # Función para cargar datos con caché
-@st.cache_data
+@st.cache_resource
 def load_data():
-    """Cargar y preparar los datos con métricas de negocio calculadas"""
-    df = pd.read_csv(r'Data\Clean\df_maestro_con_temporales.csv')
-    
-    # Convertir fechas
-    df['fecha'] = pd.to_datetime(df['fecha'])
-    
-    # Verificar si existe la columna con el nombre correcto
-    if 'departute_local_time' in df.columns:
-        df['departute_local_time'] = pd.to_datetime(df['departute_local_time'])
-        df['arrival_local_time'] = pd.to_datetime(df['arrival_local_time'])
-        # Calcular duración de vuelo (usar valor absoluto para evitar negativos por cruces de huso horario)
-        df['duracion_vuelo_segundos'] = (df['arrival_local_time'] - df['departute_local_time']).dt.total_seconds()
-        df['duracion_vuelo_horas'] = abs(df['duracion_vuelo_segundos'] / 3600)
-    
-    # Variables temporales
-    df['año'] = df['fecha'].dt.year
-    df['mes'] = df['fecha'].dt.month
-    df['mes_nombre'] = df['fecha'].dt.strftime('%B')
-    df['semana'] = df['fecha'].dt.isocalendar().week
-    df['dia'] = df['fecha'].dt.day
-    df['dia_semana'] = df['fecha'].dt.day_name()
-    df['dia_semana_num'] = df['fecha'].dt.dayofweek
-    
-    # Ruta
-    df['ruta'] = df['origen'] + ' → ' + df['destino']
-    
-    # ===== MÉTRICAS DE NEGOCIO CALCULADAS =====
-    # Revenue Per Passenger (RPP)
-    df['revenue_per_passenger'] = df['sales'] / df['passengers'].replace(0, np.nan)
-    
-    # Contribution Margin (asumiendo que lost_sales es costo de oportunidad)
-    df['contribution_margin'] = df['sales'] - df['lost_sales']
-    df['margin_percentage'] = (df['contribution_margin'] / df['sales'].replace(0, np.nan)) * 100
-    
-    # Clasificación de performance de rutas
-    ruta_performance = df.groupby('ruta').agg({
-        'sales': 'sum',
-        'passengers': 'sum'
-    })
-    ruta_performance['performance_score'] = (
-        (ruta_performance['sales'] / ruta_performance['sales'].max()) * 0.6 +
-        (ruta_performance['passengers'] / ruta_performance['passengers'].max()) * 0.4
-    )
-    df = df.merge(ruta_performance[['performance_score']], left_on='ruta', right_index=True, how='left')
-    
-    # Clasificación de productos (BCG Matrix simplificada)
-    item_sales = df.groupby('item_code')['sales'].sum()
-    item_freq = df.groupby('item_code').size()
-    
-    df['item_sales_rank'] = df['item_code'].map(item_sales.rank(pct=True))
-    df['item_freq_rank'] = df['item_code'].map(item_freq.rank(pct=True))
-    
-    # Clasificación: Star, Cash Cow, Question Mark, Dog
-    def classify_product(row):
-        if row['item_sales_rank'] >= 0.7 and row['item_freq_rank'] >= 0.7:
-            return 'Star ⭐'
-        elif row['item_sales_rank'] >= 0.7 and row['item_freq_rank'] < 0.7:
-            return 'Cash Cow 💰'
-        elif row['item_sales_rank'] < 0.7 and row['item_freq_rank'] >= 0.7:
-            return 'Question Mark ❓'
-        else:
-            return 'Dog 🐕'
-    
-    df['product_category'] = df.apply(classify_product, axis=1)
-    
-    return df
+    """Cargar y preparar los datos con métricas de negocio calculadas
+
+    `cache_resource` entrega el mismo DataFrame a todas las sesiones, sin
+    copias por sesión: es de solo lectura (los filtros usan take/assign).
+    """
+    # Variables ya materializadas por clean_data.py / features.py: se abren mapeadas en memoria
+    if os.path.isdir(output_parquet) and not features_are_stale():
+        return load_shared()
+
+    # Preferir el Parquet tipado (sin parseo de texto); el CSV queda como respaldo
+    if os.path.isdir(output_parquet):
+        df = read_clean_data()
+    else:
+        df = pd.read_csv(r'Data\Clean\df_maestro_con_temporales.csv')
+
+    # Variables temporales, ruta y métricas de negocio
+    return add_features(df)
+
+@st.cache_resource
+def load_filter_index():
+    """Índice de filas por valor de cada filtro (se construye una vez por proceso)"""
+    return FilterIndex(load_data())
+
+@st.cache_resource
+def load_cube():
+    """Cubo pre-agregado de ventas (materializado por clean_data.py; si falta, se calcula aquí)"""
+    if os.path.isfile(output_cube) and not cube_is_stale():
+        return SalesCube(read_cube())
+    return SalesCube(build_cube(load_data()))
+
+@st.cache_resource
+def load_flight_counter():
+    """Vuelos distintos por selección de filas (métrica no aditiva, fuera del cubo)"""
+    return FlightCounter(load_data())
+
+@st.cache_resource
+def load_agg_cache():
+    """Resultados de las secciones por estado de filtros, compartidos por todas las sesiones"""
+    return AggregationCache()
 
 # Cargar datos
 with st.spinner('Cargando datos...'):
@@ -212,8 +193,9 @@ st.sidebar.markdown("---")
 
 # Filtro de fecha con presets
 st.sidebar.subheader("📅 Período de Análisis")
-fecha_min = df['fecha'].min().date()
-fecha_max = df['fecha'].max().date()
+# Los datos están ordenados por fecha: primera y última fila
+fecha_min = df['fecha'].iloc[0].date()
+fecha_max = df['fecha'].iloc[-1].date()
 
 preset = st.sidebar.selectbox(
     "Selección rápida:",
@@ -283,61 +265,227 @@ with st.sidebar.expander("⚙️ Filtros Avanzados"):
     tipos_trans = ['Todos'] + sorted(df['type_transaction'].unique().tolist())
     tipo_trans_seleccionado = st.selectbox("Tipo de Transacción:", tipos_trans, key="tipo_trans_filter")
     
+    # Umbrales de la clasificación BCG (ranking percentil de ventas y de frecuencia por item)
+    umbral_ventas = st.slider("Umbral de ventas (percentil):", 0.05, 0.95, SALES_THRESHOLD, 0.05,
+                              key="umbral_ventas_filter")
+    umbral_frecuencia = st.slider("Umbral de frecuencia (percentil):", 0.05, 0.95, FREQ_THRESHOLD, 0.05,
+                                  key="umbral_frecuencia_filter")
+    clasificar_seleccion = st.checkbox("Clasificar productos según la selección actual",
+                                       key="clasificar_seleccion_filter")
+
     # Filtro por clasificación de producto
-    product_cats = ['Todas'] + sorted(df['product_category'].unique().tolist())
+    product_cats = ['Todas'] + PRODUCT_CLASSES
     product_cat_seleccionada = st.selectbox("Clasificación de Producto:", product_cats, key="product_cat_filter")
 
-# Aplicar filtros
-df_filtrado = df.copy()
+# Aplicar filtros: el índice intersecta las selecciones y se toma un solo subconjunto
+def sin_filtro(valor):
+    return None if valor in ('Todas', 'Todos') else valor
 
-# Filtro de fecha
-df_filtrado = df_filtrado[
-    (df_filtrado['fecha'].dt.date >= fecha_inicio) & 
-    (df_filtrado['fecha'].dt.date <= fecha_fin)
-]
+# La clase de producto solo está indexada con los umbrales por defecto sobre el dataset completo
+umbrales_por_defecto = (umbral_ventas, umbral_frecuencia) == (SALES_THRESHOLD, FREQ_THRESHOLD)
+clase_indexada = not clasificar_seleccion and umbrales_por_defecto
+seleccion = {
+    'nombre_de_aerolinea': sin_filtro(aerolinea_seleccionada),
+    'warehouse': sin_filtro(warehouse_seleccionado),
+    'supercategory': sin_filtro(supercat_seleccionada),
+    'category': sin_filtro(categoria_seleccionada),
+    'origen': sin_filtro(origen_seleccionado),
+    'destino': sin_filtro(destino_seleccionado),
+    'type_transaction': sin_filtro(tipo_trans_seleccionado),
+    'product_category': sin_filtro(product_cat_seleccionada) if clase_indexada else None,
+}
 
-# Filtros de dimensiones
-if aerolinea_seleccionada != 'Todas':
-    df_filtrado = df_filtrado[df_filtrado['nombre_de_aerolinea'] == aerolinea_seleccionada]
+# Estado canónico de los filtros: clave de los resultados guardados en caché
+estado_filtros = filter_key(fecha_inicio, fecha_fin, seleccion,
+                            umbral_ventas=umbral_ventas, umbral_frecuencia=umbral_frecuencia,
+                            clasificar_seleccion=clasificar_seleccion, product_category=product_cat_seleccionada)
+
+_seleccion = {}
 
-if warehouse_seleccionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['warehouse'] == warehouse_seleccionado]
+def seleccion_actual():
+    """Filas, subconjunto y celdas del cubo de los filtros actuales
 
-if supercat_seleccionada != 'Todas':
-    df_filtrado = df_filtrado[df_filtrado['supercategory'] == supercat_seleccionada]
+    Se calcula solo la primera vez que una sección no encuentra su resultado
+    en caché; las vistas repetidas no tocan los datos.
+    """
+    if not _seleccion:
+        filas = load_filter_index().select(seleccion, date_range=(fecha_inicio, fecha_fin))
+        if len(filas) == 0 or filas[-1] - filas[0] + 1 == len(filas):
+            # Filas contiguas (p. ej. solo rango de fechas sobre datos ordenados): vista sin copia
+            df_filtrado = df.iloc[filas[0]:filas[-1] + 1] if len(filas) else df.iloc[:0]
+        else:
+            df_filtrado = df.take(filas)
 
-if categoria_seleccionada != 'Todas':
-    df_filtrado = df_filtrado[df_filtrado['category'] == categoria_seleccionada]
+        # Las mismas selecciones sobre el cubo, de donde salen KPIs y agregaciones
+        cubo = load_cube().select(seleccion, date_range=(fecha_inicio, fecha_fin))
 
-# Filtros geográficos
-if origen_seleccionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['origen'] == origen_seleccionado]
+        if not umbrales_por_defecto:
+            # Con otros umbrales se reclasifica a partir de los rankings ya materializados
+            df_filtrado = df_filtrado.assign(product_category=classify_rows(
+                df_filtrado['item_sales_rank'], df_filtrado['item_freq_rank'], umbral_ventas, umbral_frecuencia))
+            cubo = cubo.assign(product_category=classify_rows(
+                cubo['item_sales_rank'], cubo['item_freq_rank'], umbral_ventas, umbral_frecuencia))
 
-if destino_seleccionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['destino'] == destino_seleccionado]
+        if clasificar_seleccion:
+            # Rankings y clases recalculados solo con las filas seleccionadas
+            df_filtrado = df_filtrado.assign(product_category=classify_products(
+                df_filtrado['item_code'], df_filtrado['sales'], umbral_ventas, umbral_frecuencia))
+            cubo = cubo.assign(product_category=classify_products(
+                cubo['item_code'], cubo['sales'], umbral_ventas, umbral_frecuencia, weights=cubo[COUNT_COL]))
 
-# Filtros avanzados
-if tipo_trans_seleccionado != 'Todos':
-    df_filtrado = df_filtrado[df_filtrado['type_transaction'] == tipo_trans_seleccionado]
+        if not clase_indexada and product_cat_seleccionada != 'Todas':
+            en_clase = (df_filtrado['product_category'] == product_cat_seleccionada).to_numpy()
+            df_filtrado, filas = df_filtrado[en_clase], filas[en_clase]
+            cubo = cubo[cubo['product_category'] == product_cat_seleccionada]
+
+        _seleccion.update(filas=filas, df_filtrado=df_filtrado, cubo=cubo)
+    return _seleccion['filas'], _seleccion['df_filtrado'], _seleccion['cubo']
+
+def agregado(seccion, calcular):
+    """Resultado de `calcular(filas, df_filtrado, cubo)` para los filtros actuales (desde la caché si existe)"""
+    return load_agg_cache().get_or_compute((seccion, estado_filtros), lambda: calcular(*seleccion_actual()))
+
+# Agregaciones de cada sección. Los resultados se comparten entre sesiones: no se modifican al mostrarlos
+def agg_resumen(filas, df_filtrado, cubo):
+    return {
+        'registros': len(filas),
+        'kpis': totals(cubo),
+        'vuelos': load_flight_counter().count(filas),
+        'top_ruta': rollup(cubo, 'ruta')['sales'].sort_values(ascending=False).head(1),
+        'top_star': rollup(cubo[cubo['product_category'] == 'Star ⭐'], 'item_code')['sales']
+                    .sort_values(ascending=False).head(1),
+    }
+
+def agg_executive(filas, df_filtrado, cubo):
+    # Revenue y pasajeros del cubo; vuelos distintos por ruta de las filas seleccionadas
+    rutas = rollup(cubo, 'ruta', ['sales', 'passengers'])
+    rutas['flights'] = load_flight_counter().by_route(filas).reindex(rutas.index.astype(str), fill_value=0).to_numpy()
+    rutas.columns = ['Revenue', 'Pasajeros', 'Vuelos']
+
+    bcg_summary = cubo.groupby('product_category', observed=True).agg({
+        'sales': 'sum',
+        'item_code': 'nunique',
+        COUNT_COL: 'sum'
+    }).reset_index()
+    bcg_summary.columns = ['Categoría', 'Revenue', 'Items Únicos', 'Transacciones']
+    return {
+        'top_routes': rutas.sort_values('Revenue', ascending=False).head(5),
+        'bottom_routes': rutas.sort_values('Revenue', ascending=True).head(5),
+        'bcg_summary': bcg_summary,
+    }
+
+def agg_temporal(filas, df_filtrado, cubo):
+    return {
+        'ventas_diarias': downsample_line(rollup(cubo, 'fecha')['sales'].reset_index(), 'fecha', 'sales'),
+        'pasajeros_diarios': downsample_line(rollup(cubo, 'fecha', ['passengers'])['passengers'].reset_index(),
+                                             'fecha', 'passengers'),
+        'ventas_por_dia_semana': rollup(cubo, 'dia_semana')['sales'].reindex([
+            'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'
+        ]),
+        'ventas_por_mes': rollup(cubo, 'mes')['sales'].reset_index(),
+    }
 
-if product_cat_seleccionada != 'Todas':
-    df_filtrado = df_filtrado[df_filtrado['product_category'] == product_cat_seleccionada]
+def agg_rutas(filas, df_filtrado, cubo):
+    top_rutas = rollup(cubo, 'ruta', [COUNT_COL])[COUNT_COL].sort_values(ascending=False).head(15).reset_index()
+    top_rutas.columns = ['ruta', 'count']
+    top_origenes = (rollup(cubo, 'origen', [COUNT_COL])[COUNT_COL].sort_values(ascending=False)
+                    .loc[lambda s: s > 0].head(10).reset_index())
+    top_origenes.columns = ['origen', 'count']
+    top_destinos = (rollup(cubo, 'destino', [COUNT_COL])[COUNT_COL].sort_values(ascending=False)
+                    .loc[lambda s: s > 0].head(10).reset_index())
+    top_destinos.columns = ['destino', 'count']
+    return {
+        'top_rutas': top_rutas,
+        'ventas_por_ruta': rollup(cubo, 'ruta')['sales'].sort_values(ascending=False).head(15).reset_index(),
+        'top_origenes': top_origenes,
+        'top_destinos': top_destinos,
+    }
+
+def agg_productos(filas, df_filtrado, cubo):
+    top_items = rollup(cubo, 'item_code', ['sales', 'passengers', COUNT_COL]).sort_values('sales', ascending=False).head(20)
+    top_items.columns = ['Ventas Totales', 'Pasajeros', 'Transacciones']
+    top_items.index.name = 'Item Code'
+    return {
+        'ventas_supercat': rollup(cubo, 'supercategory')['sales'].sort_values(ascending=False).reset_index(),
+        'ventas_warehouse': rollup(cubo, 'warehouse')['sales'].sort_values(ascending=False).reset_index(),
+        'top_items': top_items,
+    }
+
+def agg_heatmap(filas, df_filtrado, cubo):
+    heatmap_data = rollup(cubo, ['mes', 'dia'])['sales'].reset_index()
+    return heatmap_data.pivot(index='dia', columns='mes', values='sales')
+
+def agg_categorias(filas, df_filtrado, cubo):
+    resumen = rollup(cubo, 'category', ['sales', COUNT_COL, 'passengers', 'lost_sales'])
+    resumen_categoria = pd.DataFrame({
+        'Ventas Totales': resumen['sales'],
+        'Venta Promedio': resumen['sales'] / resumen[COUNT_COL],
+        'Transacciones': resumen[COUNT_COL],
+        'Pasajeros': resumen['passengers'],
+        'Ventas Perdidas': resumen['lost_sales']
+    }).round(2)
+    return resumen_categoria.sort_values('Ventas Totales', ascending=False)
+
+# Gráficas de transacciones individuales: bins, cuartiles y muestra se calculan aquí y Plotly solo recibe el resumen
+def agg_detalle_ventas(filas, df_filtrado, cubo):
+    return {
+        'hist_ventas': histogram_bins(df_filtrado['sales']),
+        'muestra': stratified_sample(df_filtrado[['passengers', 'sales', 'category']], 'category', 5000),
+    }
+
+def agg_distribuciones(filas, df_filtrado, cubo):
+    distribuciones = {'caja_perdidas': box_stats(df_filtrado['lost_sales'])}
+    if 'duracion_vuelo_horas' in df_filtrado.columns:
+        duracion = df_filtrado['duracion_vuelo_horas']
+        distribuciones['hist_duracion'] = histogram_bins(duracion)
+        # Asegurar que los valores mostrados sean positivos
+        distribuciones['duracion'] = {
+            'promedio': abs(duracion.mean()),
+            'minima': abs(duracion.min()),
+            'maxima': abs(duracion.max()),
+        }
+    return distribuciones
+
+def figura_histograma(bins, title, label):
+    """Histograma a partir de intervalos ya contados (ver chart_data.histogram_bins)"""
+    fig = px.bar(bins, x='centro', y='count', title=title, labels={'centro': label, 'count': 'Frecuencia'})
+    fig.update_traces(width=(bins['hasta'] - bins['desde']).to_numpy())
+    fig.update_layout(bargap=0)
+    return fig
+
+def figura_caja(stats, title, label):
+    """Box plot a partir de cuartiles, bigotes y muestra de atípicos ya calculados"""
+    fig = go.Figure()
+    if stats is not None:
+        fig.add_trace(go.Box(
+            x=[label], q1=[stats['q1']], median=[stats['median']], q3=[stats['q3']],
+            lowerfence=[stats['lowerfence']], upperfence=[stats['upperfence']], mean=[stats['mean']],
+            name=label, marker_color='#1f77b4', showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=[label] * len(stats['outliers']), y=stats['outliers'], mode='markers',
+            marker=dict(color='#1f77b4', size=4), name='Atípicos', showlegend=False
+        ))
+    fig.update_layout(title=title, yaxis_title=label)
+    return fig
+
+resumen = agregado('resumen', agg_resumen)
 
 # Información de filtros aplicados con métricas de comparación
 st.sidebar.markdown("---")
 st.sidebar.subheader("📊 Resumen de Filtros")
-st.sidebar.metric("Registros filtrados", f"{len(df_filtrado):,}")
-st.sidebar.metric("% del total", f"{len(df_filtrado)/len(df)*100:.1f}%")
+st.sidebar.metric("Registros filtrados", f"{resumen['registros']:,}")
+st.sidebar.metric("% del total", f"{resumen['registros']/len(df)*100:.1f}%")
 
 # Calcular período anterior para comparación
 dias_periodo = (fecha_fin - fecha_inicio).days
 fecha_inicio_anterior = fecha_inicio - timedelta(days=dias_periodo)
 fecha_fin_anterior = fecha_inicio - timedelta(days=1)
 
-df_periodo_anterior = df[
-    (df['fecha'].dt.date >= fecha_inicio_anterior) & 
-    (df['fecha'].dt.date <= fecha_fin_anterior)
-]
+# El período anterior no depende de las demás selecciones: se guarda solo por fechas
+kpis_anterior = load_agg_cache().get_or_compute(
+    ('periodo_anterior', str(fecha_inicio_anterior), str(fecha_fin_anterior)),
+    lambda: totals(load_cube().select({}, date_range=(fecha_inicio_anterior, fecha_fin_anterior))))
 
 st.sidebar.markdown("---")
 if st.sidebar.button("🔄 Resetear Filtros"):
@@ -347,15 +495,17 @@ if st.sidebar.button("🔄 Resetear Filtros"):
 st.header("📊 Executive Summary - KPIs Principales")
 
 # Calcular KPIs del período actual
-total_ventas = df_filtrado['sales'].sum()
-total_pasajeros = df_filtrado['passengers'].sum()
-total_vuelos = df_filtrado['flight_key'].nunique()
-ventas_perdidas = df_filtrado['lost_sales'].sum()
+kpis = resumen['kpis']
+total_ventas = kpis['sales']
+total_pasajeros = int(kpis['passengers'])
+total_vuelos = resumen['vuelos']
+ventas_perdidas = kpis['lost_sales']
+transacciones = int(kpis[COUNT_COL])
 revenue_per_pax = total_ventas / total_pasajeros if total_pasajeros > 0 else 0
 
 # KPIs del período anterior
-total_ventas_anterior = df_periodo_anterior['sales'].sum()
-total_pasajeros_anterior = df_periodo_anterior['passengers'].sum()
+total_ventas_anterior = kpis_anterior['sales']
+total_pasajeros_anterior = int(kpis_anterior['passengers'])
 revenue_per_pax_anterior = total_ventas_anterior / total_pasajeros_anterior if total_pasajeros_anterior > 0 else 0
 
 # Calcular variaciones
@@ -380,7 +530,6 @@ with col2:
     )
 
 with col3:
-    transacciones = len(df_filtrado)
     st.metric(
         label="✈️ Vuelos Únicos",
         value=f"{total_vuelos:,}",
@@ -404,8 +553,8 @@ with col5:
     )
 
 with col6:
-    if 'duracion_vuelo_horas' in df_filtrado.columns:
-        duracion_promedio = df_filtrado['duracion_vuelo_horas'].mean()
+    if 'duracion_vuelo_horas' in kpis.index:
+        duracion_promedio = kpis['duracion_vuelo_horas'] / transacciones if transacciones > 0 else float('nan')
         avg_ticket = total_ventas / transacciones if transacciones > 0 else 0
         st.metric(
             label="🎫 Avg Ticket",
@@ -429,7 +578,7 @@ col_insight1, col_insight2, col_insight3 = st.columns(3)
 
 with col_insight1:
     # Top performing route
-    top_ruta = df_filtrado.groupby('ruta')['sales'].sum().sort_values(ascending=False).head(1)
+    top_ruta = resumen['top_ruta']
     if len(top_ruta) > 0:
         st.markdown(f"""
         <div class="success-box">
@@ -441,9 +590,8 @@ with col_insight1:
 
 with col_insight2:
     # Producto estrella
-    stars = df_filtrado[df_filtrado['product_category'] == 'Star ⭐']
-    if len(stars) > 0:
-        top_star = stars.groupby('item_code')['sales'].sum().sort_values(ascending=False).head(1)
+    top_star = resumen['top_star']
+    if len(top_star) > 0:
         st.markdown(f"""
         <div class="success-box">
             <h4>⭐ Producto Estrella</h4>
@@ -480,18 +628,21 @@ with col_insight3:
 
 st.markdown("---")
 
-# Tabs para organizar el contenido - MEJORADOS
-tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+# Secciones del dashboard
+# A diferencia de st.tabs, que ejecuta todas las pestañas en cada rerun, solo
+# se calcula y dibuja la sección elegida (sus agregaciones quedan en caché)
+SECCIONES = [
     "📈 Executive Summary",
-    "⏱️ Análisis Temporal", 
-    "🗺️ Rutas & Performance", 
+    "⏱️ Análisis Temporal",
+    "🗺️ Rutas & Performance",
     "📦 Portfolio de Productos",
     "💹 Análisis Financiero",
     "🔍 Deep Dive Analytics"
-])
+]
+seccion = st.radio("Sección:", SECCIONES, horizontal=True, key="seccion_activa", label_visibility="collapsed")
 
-# TAB 1: EXECUTIVE SUMMARY (NUEVO)
-with tab1:
+# SECCIÓN 1: EXECUTIVE SUMMARY
+if seccion == SECCIONES[0]:
     st.header("📊 Executive Summary Dashboard")
     
     # Sección 1: Performance Overview
@@ -559,16 +710,13 @@ with tab1:
     # Sección 2: Top & Bottom Performers
     st.subheader("🏆 Top & Bottom Performers")
     
+    executive = agregado('executive', agg_executive)
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("**🔝 Top 5 Rutas por Revenue**")
-        top_routes = df_filtrado.groupby('ruta').agg({
-            'sales': 'sum',
-            'passengers': 'sum',
-            'flight_key': 'nunique'
-        }).sort_values('sales', ascending=False).head(5)
-        top_routes.columns = ['Revenue', 'Pasajeros', 'Vuelos']
+        top_routes = executive['top_routes']
         st.dataframe(
             top_routes.style.format({
                 'Revenue': '${:,.0f}',
@@ -580,12 +728,7 @@ with tab1:
     
     with col2:
         st.markdown("**� Bottom 5 Rutas por Revenue**")
-        bottom_routes = df_filtrado.groupby('ruta').agg({
-            'sales': 'sum',
-            'passengers': 'sum',
-            'flight_key': 'nunique'
-        }).sort_values('sales', ascending=True).head(5)
-        bottom_routes.columns = ['Revenue', 'Pasajeros', 'Vuelos']
+        bottom_routes = executive['bottom_routes']
         st.dataframe(
             bottom_routes.style.format({
                 'Revenue': '${:,.0f}',
@@ -598,12 +741,7 @@ with tab1:
     # Sección 3: Matriz BCG de Productos
     st.subheader("📊 BCG Matrix - Portfolio de Productos")
     
-    bcg_summary = df_filtrado.groupby('product_category').agg({
-        'sales': 'sum',
-        'item_code': 'nunique',
-        'flight_key': 'count'
-    }).reset_index()
-    bcg_summary.columns = ['Categoría', 'Revenue', 'Items Únicos', 'Transacciones']
+    bcg_summary = executive['bcg_summary']
     
     col1, col2 = st.columns([2, 1])
     
@@ -630,15 +768,16 @@ with tab1:
             use_container_width=True
         )
 
-# TAB 2: Análisis Temporal (ACTUALIZADO)
-with tab2:
+# SECCIÓN 2: Análisis Temporal
+elif seccion == SECCIONES[1]:
     st.header("📈 Análisis Temporal")
+    temporal = agregado('temporal', agg_temporal)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Ventas por día
-        ventas_diarias = df_filtrado.groupby('fecha')['sales'].sum().reset_index()
+        ventas_diarias = temporal['ventas_diarias']
         fig_ventas_diarias = px.line(
             ventas_diarias,
             x='fecha',
@@ -652,7 +791,7 @@ with tab2:
     
     with col2:
         # Pasajeros por día
-        pasajeros_diarios = df_filtrado.groupby('fecha')['passengers'].sum().reset_index()
+        pasajeros_diarios = temporal['pasajeros_diarios']
         fig_pasajeros_diarios = px.line(
             pasajeros_diarios,
             x='fecha',
@@ -668,9 +807,7 @@ with tab2:
     
     with col3:
         # Ventas por día de la semana
-        ventas_por_dia_semana = df_filtrado.groupby('dia_semana')['sales'].sum().reindex([
-            'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'
-        ])
+        ventas_por_dia_semana = temporal['ventas_por_dia_semana']
         
         fig_dia_semana = px.bar(
             x=ventas_por_dia_semana.index,
@@ -684,7 +821,7 @@ with tab2:
     
     with col4:
         # Ventas por mes
-        ventas_por_mes = df_filtrado.groupby('mes')['sales'].sum().reset_index()
+        ventas_por_mes = temporal['ventas_por_mes']
         fig_mes = px.bar(
             ventas_por_mes,
             x='mes',
@@ -696,16 +833,16 @@ with tab2:
         )
         st.plotly_chart(fig_mes, use_container_width=True)
 
-# TAB 2: Rutas y Geografía
-with tab2:
+# SECCIÓN 3: Rutas y Geografía
+elif seccion == SECCIONES[2]:
     st.header("🗺️ Análisis de Rutas")
+    rutas = agregado('rutas', agg_rutas)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Top rutas
-        top_rutas = df_filtrado['ruta'].value_counts().head(15).reset_index()
-        top_rutas.columns = ['ruta', 'count']
+        top_rutas = rutas['top_rutas']
         
         fig_rutas = px.bar(
             top_rutas,
@@ -722,7 +859,7 @@ with tab2:
     
     with col2:
         # Ventas por ruta
-        ventas_por_ruta = df_filtrado.groupby('ruta')['sales'].sum().sort_values(ascending=False).head(15).reset_index()
+        ventas_por_ruta = rutas['ventas_por_ruta']
         
         fig_ventas_ruta = px.bar(
             ventas_por_ruta,
@@ -741,8 +878,7 @@ with tab2:
     
     with col3:
         # Top orígenes
-        top_origenes = df_filtrado['origen'].value_counts().head(10).reset_index()
-        top_origenes.columns = ['origen', 'count']
+        top_origenes = rutas['top_origenes']
         
         fig_origenes = px.pie(
             top_origenes,
@@ -755,8 +891,7 @@ with tab2:
     
     with col4:
         # Top destinos
-        top_destinos = df_filtrado['destino'].value_counts().head(10).reset_index()
-        top_destinos.columns = ['destino', 'count']
+        top_destinos = rutas['top_destinos']
         
         fig_destinos = px.pie(
             top_destinos,
@@ -767,15 +902,16 @@ with tab2:
         )
         st.plotly_chart(fig_destinos, use_container_width=True)
 
-# TAB 3: Productos
-with tab3:
+# SECCIÓN 4: Productos
+elif seccion == SECCIONES[3]:
     st.header("📦 Análisis de Productos")
+    productos = agregado('productos', agg_productos)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Ventas por supercategoría
-        ventas_supercat = df_filtrado.groupby('supercategory')['sales'].sum().sort_values(ascending=False).reset_index()
+        ventas_supercat = productos['ventas_supercat']
         
         fig_supercat = px.bar(
             ventas_supercat,
@@ -792,7 +928,7 @@ with tab3:
     
     with col2:
         # Ventas por warehouse
-        ventas_warehouse = df_filtrado.groupby('warehouse')['sales'].sum().sort_values(ascending=False).reset_index()
+        ventas_warehouse = productos['ventas_warehouse']
         
         fig_warehouse = px.bar(
             ventas_warehouse,
@@ -807,13 +943,7 @@ with tab3:
     
     # Top items
     st.subheader("🏆 Top Items por Ventas")
-    top_items = df_filtrado.groupby('item_code').agg({
-        'sales': 'sum',
-        'passengers': 'sum',
-        'flight_key': 'count'
-    }).sort_values('sales', ascending=False).head(20)
-    top_items.columns = ['Ventas Totales', 'Pasajeros', 'Transacciones']
-    top_items.index.name = 'Item Code'
+    top_items = productos['top_items']
     
     st.dataframe(
         top_items.style.format({
@@ -824,26 +954,21 @@ with tab3:
         use_container_width=True
     )
 
-# TAB 4: Ventas Detalladas
-with tab4:
+# SECCIÓN 5: Ventas Detalladas
+elif seccion == SECCIONES[4]:
     st.header("💹 Análisis Detallado de Ventas")
+    detalle_ventas = agregado('detalle_ventas', agg_detalle_ventas)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Distribución de ventas
-        fig_dist_ventas = px.histogram(
-            df_filtrado,
-            x='sales',
-            nbins=50,
-            title='Distribución de Ventas',
-            labels={'sales': 'Ventas ($)', 'count': 'Frecuencia'}
-        )
+        fig_dist_ventas = figura_histograma(detalle_ventas['hist_ventas'], 'Distribución de Ventas', 'Ventas ($)')
         st.plotly_chart(fig_dist_ventas, use_container_width=True)
     
     with col2:
-        # Relación pasajeros vs ventas
-        sample_data = df_filtrado.sample(n=min(5000, len(df_filtrado)))
+        # Relación pasajeros vs ventas (muestra estratificada por categoría, la misma en cada vista)
+        sample_data = detalle_ventas['muestra']
         fig_scatter = px.scatter(
             sample_data,
             x='passengers',
@@ -858,8 +983,7 @@ with tab4:
     
     # Heatmap de ventas
     st.subheader("🔥 Mapa de Calor: Ventas por Día y Mes")
-    heatmap_data = df_filtrado.groupby(['mes', 'dia'])['sales'].sum().reset_index()
-    heatmap_pivot = heatmap_data.pivot(index='dia', columns='mes', values='sales')
+    heatmap_pivot = agregado('heatmap', agg_heatmap)
     
     fig_heatmap = px.imshow(
         heatmap_pivot,
@@ -869,58 +993,40 @@ with tab4:
     )
     st.plotly_chart(fig_heatmap, use_container_width=True)
 
-# TAB 5: Análisis Avanzado
-with tab5:
+# SECCIÓN 6: Análisis Avanzado
+elif seccion == SECCIONES[5]:
     st.header("🔍 Análisis Avanzado")
+    distribuciones = agregado('distribuciones', agg_distribuciones)
     
     col1, col2 = st.columns(2)
     
     with col1:
         # Análisis de duración de vuelo (solo si existe la columna)
-        if 'duracion_vuelo_horas' in df_filtrado.columns:
-            fig_duracion = px.histogram(
-                df_filtrado,
-                x='duracion_vuelo_horas',
-                nbins=50,
-                title='Distribución de Duración de Vuelos',
-                labels={'duracion_vuelo_horas': 'Duración (horas)', 'count': 'Frecuencia'}
-            )
+        if 'hist_duracion' in distribuciones:
+            fig_duracion = figura_histograma(distribuciones['hist_duracion'],
+                                             'Distribución de Duración de Vuelos', 'Duración (horas)')
             st.plotly_chart(fig_duracion, use_container_width=True)
             
-            # Asegurar que los valores mostrados sean positivos
-            duracion_promedio = abs(df_filtrado['duracion_vuelo_horas'].mean())
-            duracion_minima = abs(df_filtrado['duracion_vuelo_horas'].min())
-            duracion_maxima = abs(df_filtrado['duracion_vuelo_horas'].max())
-            
-            st.metric("Duración promedio de vuelo", f"{duracion_promedio:.2f} horas")
-            st.metric("Duración mínima", f"{duracion_minima:.2f} horas")
-            st.metric("Duración máxima", f"{duracion_maxima:.2f} horas")
+            duracion = distribuciones['duracion']
+            st.metric("Duración promedio de vuelo", f"{duracion['promedio']:.2f} horas")
+            st.metric("Duración mínima", f"{duracion['minima']:.2f} horas")
+            st.metric("Duración máxima", f"{duracion['maxima']:.2f} horas")
         else:
             st.info("📊 Análisis de duración de vuelo no disponible - columnas de tiempo no encontradas")
     
     with col2:
         # Análisis de ventas perdidas
-        fig_lost_sales = px.box(
-            df_filtrado,
-            y='lost_sales',
-            title='Distribución de Ventas Perdidas',
-            labels={'lost_sales': 'Ventas Perdidas ($)'}
-        )
+        fig_lost_sales = figura_caja(distribuciones['caja_perdidas'],
+                                     'Distribución de Ventas Perdidas', 'Ventas Perdidas ($)')
         st.plotly_chart(fig_lost_sales, use_container_width=True)
         
-        pct_perdidas = (df_filtrado['lost_sales'].sum() / df_filtrado['sales'].sum() * 100)
+        pct_perdidas = (ventas_perdidas / total_ventas * 100)
         st.metric("% Ventas Perdidas", f"{pct_perdidas:.2f}%")
-        st.metric("Total Ventas Perdidas", f"${df_filtrado['lost_sales'].sum():,.0f}")
+        st.metric("Total Ventas Perdidas", f"${ventas_perdidas:,.0f}")
     
     # Tabla de resumen por categoría
     st.subheader("📊 Resumen por Categoría")
-    resumen_categoria = df_filtrado.groupby('category').agg({
-        'sales': ['sum', 'mean', 'count'],
-        'passengers': 'sum',
-        'lost_sales': 'sum'
-    }).round(2)
-    resumen_categoria.columns = ['Ventas Totales', 'Venta Promedio', 'Transacciones', 'Pasajeros', 'Ventas Perdidas']
-    resumen_categoria = resumen_categoria.sort_values('Ventas Totales', ascending=False)
+    resumen_categoria = agregado('categorias', agg_categorias)
     
     st.dataframe(
         resumen_categoria.style.format({
@@ -940,4 +1046,4 @@ st.markdown("""
         <p>📊 Dashboard desarrollado para GateGroup Airlines | Datos actualizados: {} </p>
         <p>Total de registros en el sistema: {:,}</p>
     </div>
-""".format(df['fecha'].max().strftime('%Y-%m-%d'), len(df)), unsafe_allow_html=True)
+""".format(fecha_max.strftime('%Y-%m-%d'), len(df)), unsafe_allow_html=True)
@@ -0,0 +1,109 @@
+"""
+Dimensiones codificadas del dataset de GateGroup Airlines
+Cada dimensión guarda un código entero por fila y su tabla de etiquetas (categorías de pandas)
+"""
+import calendar
+import os
+import numpy as np
+import pandas as pd
+
+# Rutas
+output_dimensions = r'Data\Clean\dimensions'
+
+ROUTE_SEPARATOR = ' → '
+WEEKDAYS = list(calendar.day_name)
+MONTHS = list(calendar.month_name)[1:]
+
+# Tablas de dimensión y columnas del dataset que usan sus códigos
+DIMENSIONS = {
+    'aeropuerto': ['origen', 'destino'],
+    'ruta': ['ruta'],
+    'aerolinea': ['nombre_de_aerolinea'],
+    'warehouse': ['warehouse'],
+    'categoria': ['category'],
+    'supercategoria': ['supercategory'],
+    'tipo_transaccion': ['type_transaction'],
+    'dia_semana': ['dia_semana'],
+    'mes_nombre': ['mes_nombre'],
+}
+
+
+def shared_categories(df, columns):
+    """Pone `columns` sobre un mismo diccionario (p. ej. origen y destino como aeropuertos)
+
+    Con las mismas categorías, el código de un aeropuerto es igual en las dos
+    columnas y se pueden combinar sin comparar texto.
+    """
+    categories = pd.Index([])
+    for col in columns:
+        df[col] = df[col].astype('category')
+        categories = categories.union(df[col].cat.categories)
+    for col in columns:
+        df[col] = df[col].cat.set_categories(categories)
+    return df
+
+
+def route_codes(origen, destino):
+    """Ruta de cada fila como categórica, con la etiqueta armada solo una vez por ruta
+
+    La ruta se identifica por el par de códigos de aeropuerto; solo se crean
+    textos 'ORIGEN → DESTINO' para los pares distintos, no para cada fila.
+    """
+    origen_codes = origen.cat.codes.to_numpy(dtype=np.int64)
+    destino_codes = destino.cat.codes.to_numpy(dtype=np.int64)
+    pair = origen_codes * (len(destino.cat.categories) + 1) + destino_codes
+    codes, _ = pd.factorize(pair, sort=True)
+    first = np.unique(codes, return_index=True)[1]
+    # Mismo texto que con astype(str) fila por fila (un aeropuerto nulo queda como 'nan')
+    labels = [f"{o}{ROUTE_SEPARATOR}{d}"
+              for o, d in zip(origen.iloc[first].astype(str), destino.iloc[first].astype(str))]
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+def weekday_codes(fecha):
+    """Día de la semana como categórica ordenada de lunes a domingo"""
+    return pd.Categorical.from_codes(fecha.dt.dayofweek.to_numpy(), categories=WEEKDAYS, ordered=True)
+
+
+def month_codes(fecha):
+    """Nombre del mes como categórica ordenada de enero a diciembre"""
+    return pd.Categorical.from_codes(fecha.dt.month.to_numpy() - 1, categories=MONTHS, ordered=True)
+
+
+def restore_dimensions(df):
+    """Vuelve a fijar los diccionarios al leer desde Parquet
+
+    Al unir los archivos de varias particiones, pyarrow arma las categorías en
+    orden de aparición: se restablecen el orden de días y meses y el
+    diccionario común de aeropuertos.
+    """
+    if 'dia_semana' in df.columns:
+        df['dia_semana'] = df['dia_semana'].astype('category').cat.set_categories(WEEKDAYS, ordered=True)
+    if 'mes_nombre' in df.columns:
+        df['mes_nombre'] = df['mes_nombre'].astype('category').cat.set_categories(MONTHS, ordered=True)
+    if 'origen' in df.columns and 'destino' in df.columns:
+        df = shared_categories(df, ['origen', 'destino'])
+    return df
+
+
+def dimension_table(df, name):
+    """Tabla código → etiqueta de una dimensión (la de rutas incluye también sus aeropuertos)"""
+    labels = df[DIMENSIONS[name][0]].cat.categories
+    table = pd.DataFrame({'codigo': np.arange(len(labels), dtype=np.int32), name: labels})
+    if name == 'ruta':
+        codes, first = np.unique(df['ruta'].cat.codes.to_numpy(), return_index=True)
+        first = first[codes >= 0]
+        table.loc[codes[codes >= 0], 'origen'] = df['origen'].to_numpy()[first]
+        table.loc[codes[codes >= 0], 'destino'] = df['destino'].to_numpy()[first]
+    return table
+
+
+def write_dimension_tables(df, path=output_dimensions):
+    """Guarda las tablas de dimensión presentes en el dataset (una por archivo Parquet)"""
+    os.makedirs(path, exist_ok=True)
+    written = []
+    for name, columns in DIMENSIONS.items():
+        if all(col in df.columns for col in columns):
+            dimension_table(df, name).to_parquet(os.path.join(path, f"{name}.parquet"), index=False)
+            written.append(name)
+    return written
@@ -1,77 +1,67 @@
 """
 Script para explorar los datos antes de limpiarlos
-Optimizado para archivos grandes
+Perfila cada archivo completo en una sola pasada por bloques (8 bytes por fila distinta, para los duplicados)
 """
 import pandas as pd
-import numpy as np
+from profiler import profile_file
 
 # Rutas de los archivos
 file_a = r'Data\Raw\result_hack 3.2 REDUCED A.csv'
 file_b = r'Data\Raw\result_hack 3.2 REDUCED b.csv'
 
-print("=" * 80)
-print("EXPLORANDO ARCHIVO A")
-print("=" * 80)
-
-# Leer el archivo A (solo las primeras 10000 filas para exploración rápida)
-print("Cargando archivo A (muestra de 10,000 filas)...")
-df_a = pd.read_csv(file_a, nrows=10000)
+# Filas por bloque: fija la memoria de cada bloque (los hashes de filas crecen 8 bytes por fila distinta)
+CHUNKSIZE = 200_000
 
-print(f"\n📊 Dimensiones: {df_a.shape[0]} filas x {df_a.shape[1]} columnas")
-print(f"\n📋 Columnas:")
-print(df_a.columns.tolist())
+pd.set_option('display.max_columns', None)
+pd.set_option('display.width', 200)
 
-print(f"\n🔍 Información general:")
-print(df_a.info())
 
-print(f"\n📈 Primeras filas:")
-print(df_a.head())
+def print_profile(title, profile):
+    print("=" * 80)
+    print(f"EXPLORANDO {title}")
+    print("=" * 80)
 
-print(f"\n❌ Valores nulos por columna:")
-print(df_a.isnull().sum())
+    print(f"\n📊 Dimensiones: {profile.rows} filas x {len(profile.columns)} columnas")
+    print(f"\n📋 Columnas:")
+    print(list(profile.columns))
 
-print(f"\n📊 Porcentaje de valores nulos:")
-print((df_a.isnull().sum() / len(df_a) * 100).round(2))
+    print(f"\n🔍 Tipos de datos (esquema declarado):")
+    print(profile.dtypes)
 
-print(f"\n🔢 Duplicados: {df_a.duplicated().sum()}")
+    print(f"\n📈 Primeras filas:")
+    print(profile.head)
 
-print(f"\n📊 Estadísticas descriptivas (columnas numéricas):")
-print(df_a.describe())
-
-print("\n" + "=" * 80)
-print("EXPLORANDO ARCHIVO B")
-print("=" * 80)
+    summary = profile.summary()
+    print(f"\n❌ Valores nulos por columna (exactos; 'no válidos' = no respetan el tipo declarado):")
+    print(summary[['nulos', '% nulos', 'no válidos']])
 
-# Leer el archivo B (solo las primeras 10000 filas para exploración rápida)
-print("Cargando archivo B (muestra de 10,000 filas)...")
-df_b = pd.read_csv(file_b, nrows=10000)
+    print(f"\n🔢 Filas duplicadas (exactas): {profile.duplicates}")
 
-print(f"\n📊 Dimensiones: {df_b.shape[0]} filas x {df_b.shape[1]} columnas")
-print(f"\n📋 Columnas:")
-print(df_b.columns.tolist())
+    print(f"\n📊 Rango, distintos y cuantiles por columna:")
+    print(summary.drop(columns=['dtype', 'nulos', '% nulos', 'no válidos']).to_string())
+    print()
 
-print(f"\n🔍 Información general:")
-print(df_b.info())
 
-print(f"\n📈 Primeras filas:")
-print(df_b.head())
+print("Perfilando archivo A completo (por bloques)...")
+profile_a = profile_file(file_a, CHUNKSIZE)
+print_profile("ARCHIVO A", profile_a)
 
-print(f"\n❌ Valores nulos por columna:")
-print(df_b.isnull().sum())
+print("Perfilando archivo B completo (por bloques)...")
+profile_b = profile_file(file_b, CHUNKSIZE)
+print_profile("ARCHIVO B", profile_b)
 
-print(f"\n📊 Porcentaje de valores nulos:")
-print((df_b.isnull().sum() / len(df_b) * 100).round(2))
-
-print(f"\n🔢 Duplicados: {df_b.duplicated().sum()}")
-
-print(f"\n📊 Estadísticas descriptivas (columnas numéricas):")
-print(df_b.describe())
-
-print("\n" + "=" * 80)
+print("=" * 80)
 print("COMPARACIÓN ENTRE ARCHIVOS")
 print("=" * 80)
 
-print(f"\n¿Tienen las mismas columnas? {set(df_a.columns) == set(df_b.columns)}")
-if set(df_a.columns) != set(df_b.columns):
-    print(f"Columnas solo en A: {set(df_a.columns) - set(df_b.columns)}")
-    print(f"Columnas solo en B: {set(df_b.columns) - set(df_a.columns)}")
+cols_a, cols_b = set(profile_a.columns), set(profile_b.columns)
+print(f"\n¿Tienen las mismas columnas? {cols_a == cols_b}")
+if cols_a != cols_b:
+    print(f"Columnas solo en A: {cols_a - cols_b}")
+    print(f"Columnas solo en B: {cols_b - cols_a}")
+
+# Se compara el nombre del tipo: dos category con distintas categorías cuentan como iguales
+different_types = [col for col in cols_a & cols_b if str(profile_a.dtypes[col]) != str(profile_b.dtypes[col])]
+print(f"¿Tienen los mismos tipos? {not different_types}")
+for col in sorted(different_types):
+    print(f"  - {col}: A={profile_a.dtypes[col]}, B={profile_b.dtypes[col]}")
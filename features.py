@@ -0,0 +1,155 @@
+"""
+Variables derivadas del dataset limpio para GateGroup Airlines
+Calcula las columnas temporales, de ruta y métricas de negocio que usa el dashboard
+
+Uso:
+    python features.py    # materializa las variables en Data/Clean/features_parquet
+"""
+import os
+import time
+import pandas as pd
+import numpy as np
+from dimensions import (month_codes, output_dimensions, restore_dimensions, route_codes, shared_categories,
+                        weekday_codes, write_dimension_tables)
+from product_classes import classify_rows, item_ranks
+from schema import CATEGORY_COLS
+from storage import ParquetPartitionWriter, output_parquet, read_clean_data
+
+# Rutas
+output_features = r'Data\Clean\features_parquet'
+
+
+def add_features(df):
+    """Agrega al dataset limpio las variables temporales y las métricas de negocio calculadas"""
+    # Convertir fechas
+    df['fecha'] = pd.to_datetime(df['fecha'])
+
+    # Dimensiones como códigos enteros con su diccionario (el CSV de respaldo llega como texto)
+    for col in CATEGORY_COLS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    # Verificar si existe la columna con el nombre correcto
+    if 'departute_local_time' in df.columns:
+        df['departute_local_time'] = pd.to_datetime(df['departute_local_time'])
+        df['arrival_local_time'] = pd.to_datetime(df['arrival_local_time'])
+        # Calcular duración de vuelo (usar valor absoluto para evitar negativos por cruces de huso horario)
+        df['duracion_vuelo_segundos'] = (df['arrival_local_time'] - df['departute_local_time']).dt.total_seconds()
+        df['duracion_vuelo_horas'] = abs(df['duracion_vuelo_segundos'] / 3600)
+
+    # Variables temporales
+    df['año'] = df['fecha'].dt.year
+    df['mes'] = df['fecha'].dt.month
+    df['mes_nombre'] = month_codes(df['fecha'])
+    df['semana'] = df['fecha'].dt.isocalendar().week
+    df['dia'] = df['fecha'].dt.day
+    df['dia_semana'] = weekday_codes(df['fecha'])
+    df['dia_semana_num'] = df['fecha'].dt.dayofweek
+
+    # Ruta: origen y destino comparten el diccionario de aeropuertos y cada
+    # ruta es un código; su texto se arma una vez por ruta, no por fila
+    df = shared_categories(df, ['origen', 'destino'])
+    df['ruta'] = route_codes(df['origen'], df['destino'])
+
+    # ===== MÉTRICAS DE NEGOCIO CALCULADAS =====
+    # Revenue Per Passenger (RPP)
+    df['revenue_per_passenger'] = df['sales'] / df['passengers'].replace(0, np.nan)
+
+    # Contribution Margin (asumiendo que lost_sales es costo de oportunidad)
+    df['contribution_margin'] = df['sales'] - df['lost_sales']
+    df['margin_percentage'] = (df['contribution_margin'] / df['sales'].replace(0, np.nan)) * 100
+
+    # Clasificación de performance de rutas
+    ruta_performance = df.groupby('ruta', observed=True).agg({
+        'sales': 'sum',
+        'passengers': 'sum'
+    })
+    ruta_performance['performance_score'] = (
+        (ruta_performance['sales'] / ruta_performance['sales'].max()) * 0.6 +
+        (ruta_performance['passengers'] / ruta_performance['passengers'].max()) * 0.4
+    )
+    # Se reparte por código de ruta (sin merge ni copia del dataset)
+    score = ruta_performance['performance_score'].reindex(df['ruta'].cat.categories).to_numpy()
+    df['performance_score'] = score[df['ruta'].cat.codes.to_numpy()]
+
+    # Clasificación de productos (BCG Matrix simplificada): rankings y clase por item_code
+    codes, sales_rank, freq_rank = item_ranks(df['item_code'], df['sales'])
+    df['item_sales_rank'] = sales_rank[codes]
+    df['item_freq_rank'] = freq_rank[codes]
+
+    # Clasificación: Star, Cash Cow, Question Mark, Dog (categórica, umbrales por defecto)
+    df['product_category'] = classify_rows(df['item_sales_rank'], df['item_freq_rank'])
+
+    return sort_by_fecha(df)
+
+
+def sort_by_fecha(df):
+    """Dataset ordenado por `fecha` (orden estable); si ya lo está se devuelve sin copiar
+
+    Con las filas en orden, un rango de fechas es un intervalo contiguo de
+    posiciones (ver filter_index.DayIndex).
+    """
+    if df['fecha'].is_monotonic_increasing:
+        return df
+    return df.sort_values('fecha', kind='stable', ignore_index=True)
+
+
+def daily_series(df):
+    """Serie diaria de ventas, pasajeros, ventas perdidas y vuelos (como en time_series_model.ipynb)"""
+    ts_daily = df.groupby('fecha').agg({
+        'sales': 'sum',
+        'passengers': 'sum',
+        'lost_sales': 'sum',
+        'flight_key': 'count'
+    }).rename(columns={'flight_key': 'num_vuelos'})
+
+    # Asegurar que no falten fechas
+    return ts_daily.asfreq('D', fill_value=0)
+
+
+def materialize_features(source=output_parquet, path=output_features, dimensions_path=output_dimensions):
+    """Calcula una sola vez las variables derivadas y las guarda como Parquet por mes
+
+    Los rankings de rutas y productos dependen del dataset completo, por eso se
+    parte siempre del Parquet limpio entero y el resultado se reescribe. Las
+    filas se escriben ordenadas por fecha, junto con las tablas de dimensión
+    (código → etiqueta). Devuelve el número de filas escritas.
+    """
+    df = add_features(read_clean_data(source))
+    writer = ParquetPartitionWriter(path)
+    writer.write(df)
+    write_dimension_tables(df, dimensions_path)
+    return writer.rows
+
+
+def read_features(path=output_features, columns=None, months=None):
+    """Carga el dataset con variables ya materializadas (solo `columns` y `months` si se indican)
+
+    El resultado queda ordenado por fecha aunque el orden de lectura de las
+    particiones cambie.
+    """
+    df = restore_dimensions(read_clean_data(path, columns=columns, months=months))
+    return sort_by_fecha(df) if 'fecha' in df.columns else df
+
+
+def features_are_stale(source=output_parquet, path=output_features):
+    """True si falta el Parquet de variables o es más viejo que el dataset limpio"""
+    def last_modified(folder):
+        return max((os.path.getmtime(os.path.join(root, name))
+                    for root, _, names in os.walk(folder) for name in names), default=0.0)
+
+    if not os.path.isdir(path):
+        return True
+    return os.path.isdir(source) and last_modified(source) > last_modified(path)
+
+
+def main():
+    print("⚙️ Materializando variables derivadas...")
+    started = time.perf_counter()
+    rows = materialize_features()
+    print(f"✅ {rows:,} filas con variables guardadas en: {output_features} "
+          f"({time.perf_counter() - started:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
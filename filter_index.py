@@ -0,0 +1,109 @@
+"""
+Índices de los filtros del dashboard de GateGroup Airlines
+Por cada dimensión guarda el código de cada fila y la lista ordenada de filas de cada valor;
+las fechas se resuelven con el desplazamiento de fila de cada día (datos ordenados por fecha)
+"""
+import numpy as np
+import pandas as pd
+
+# Dimensiones del sidebar que se indexan
+FILTER_COLUMNS = ['nombre_de_aerolinea', 'warehouse', 'supercategory', 'category',
+                  'origen', 'destino', 'type_transaction', 'product_category']
+
+
+class DayIndex:
+    """Primera fila de cada día sobre datos ordenados por `fecha`
+
+    Un rango de fechas es un intervalo contiguo de filas [inicio, fin): se
+    obtiene indexando `starts`, sin comparar cada fila.
+    """
+
+    def __init__(self, fecha):
+        days = np.asarray(fecha, dtype='datetime64[ns]').astype('datetime64[D]')
+        self.n_rows = len(days)
+        if self.n_rows == 0:
+            self.first_day = np.datetime64('1970-01-01', 'D')
+            self.starts = np.zeros(1, dtype=np.int64)
+            return
+        offsets = (days - days[0]).astype(np.int64)
+        if (np.diff(offsets) < 0).any():
+            raise ValueError("Los datos deben estar ordenados por fecha")
+        self.first_day = days[0]
+        # starts[d] = primera fila con día >= first_day + d (el último elemento es n_rows)
+        self.starts = np.searchsorted(offsets, np.arange(offsets[-1] + 2))
+
+    def _offset(self, day):
+        offset = int((np.datetime64(pd.Timestamp(day).date(), 'D') - self.first_day).astype(np.int64))
+        return min(max(offset, 0), len(self.starts) - 1)
+
+    def slice(self, start, end):
+        """(inicio, fin) de las filas con fecha entre `start` y `end`, ambos incluidos"""
+        lo = self.starts[self._offset(start)]
+        hi = self.starts[self._offset(pd.Timestamp(end) + pd.Timedelta(days=1))]
+        return int(lo), int(max(lo, hi))
+
+
+class FilterIndex:
+    """Índice invertido de filas por valor para cada dimensión de filtro
+
+    Se construye una vez sobre el dataset cargado, ordenado por fecha. Una
+    selección parte de la lista de filas más corta entre los valores elegidos
+    y la reduce con los códigos de las demás dimensiones, así que el costo
+    depende del tamaño de la selección y no del dataset. El rango de fechas se
+    recorta con búsqueda binaria. Devuelve posiciones de fila para tomar un
+    único subconjunto al final.
+    """
+
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.n_rows = len(df)
+        self.days = DayIndex(df['fecha'])
+        self.dims = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            codes, values = pd.factorize(df[col])
+            order = np.argsort(codes, kind='stable').astype(np.int32)
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            # Las filas nulas (código -1) quedan al principio de `order`
+            starts = int((codes < 0).sum()) + np.r_[0, np.cumsum(counts)]
+            self.dims[col] = {
+                'codes': codes.astype(np.int32),
+                'lookup': {value: code for code, value in enumerate(values)},
+                'order': order,
+                'starts': starts,
+            }
+
+    def rows(self, col, value):
+        """Posiciones (ordenadas) de las filas donde `col` vale `value`"""
+        dim = self.dims[col]
+        code = dim['lookup'].get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return dim['order'][dim['starts'][code]:dim['starts'][code + 1]]
+
+    def select(self, selections, date_range=None):
+        """Posiciones (ordenadas) de las filas que cumplen todos los filtros
+
+        `selections` es {columna: valor}; un valor None no filtra esa columna.
+        `date_range` es (fecha_inicio, fecha_fin), ambos incluidos.
+        """
+        active = [(col, value) for col, value in selections.items() if value is not None]
+        rows = None
+        if active:
+            lists = {col: self.rows(col, value) for col, value in active}
+            first = min(lists, key=lambda col: len(lists[col]))
+            rows = lists[first]
+            for col, value in active:
+                if col != first and len(rows):
+                    dim = self.dims[col]
+                    rows = rows[dim['codes'][rows] == dim['lookup'][value]]
+
+        if date_range is not None:
+            # Las filas están ordenadas por fecha: el rango es un intervalo de posiciones
+            lo, hi = self.days.slice(*date_range)
+            if rows is None:
+                rows = np.arange(lo, hi)
+            else:
+                rows = rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)]
+
+        return np.arange(self.n_rows) if rows is None else rows
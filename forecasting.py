@@ -0,0 +1,279 @@
+"""
+Motor de pronósticos por lotes para GateGroup Airlines
+Arma las series diarias por ruta, warehouse e item_code y las ajusta en paralelo en un pool de procesos
+
+Uso:
+    python forecasting.py                                   # ruta, warehouse e item_code, 30 días
+    python forecasting.py --levels ruta --horizon 14 --workers 8
+    python forecasting.py --levels item_code --min-days 60 --timeout 5
+    python forecasting.py --levels ruta --search-order       # orden SARIMA elegido por serie
+"""
+import argparse
+import math
+import os
+import signal
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from baselines import best_baseline, seasonal_naive
+from cube import build_cube, cube_is_stale, read_cube, rollup
+from features import read_features
+from order_search import format_order, model_trend, search_order
+
+# Rutas
+output_forecasts = r'Data\Clean\forecast_batch.parquet'
+
+# Niveles de agregación de las series y parámetros por defecto
+SERIES_LEVELS = ['ruta', 'warehouse', 'item_code']
+HORIZON = 30
+SEASONAL_PERIOD = 7
+
+# Modelo principal (el SARIMA del notebook) y alternativas, en orden, si falla o se pasa del tiempo
+ORDER = (1, 1, 1)
+SEASONAL_ORDER = (1, 1, 1, SEASONAL_PERIOD)
+MODELS = ['sarima', 'holt_winters', 'seasonal_naive']
+
+# Segundos máximos de ajuste por serie, series por tarea del pool y días con ventas mínimos para ajustar
+TIMEOUT = 10.0
+CHUNK_SIZE = 16
+MIN_DAYS = 28
+
+
+class FitTimeout(Exception):
+    """El ajuste de una serie superó su tiempo máximo"""
+
+
+def load_series(levels=SERIES_LEVELS, value='sales'):
+    """Series diarias de `value` por cada nivel: {nivel: DataFrame fecha x serie}
+
+    Se leen del cubo pre-agregado (una sola lectura para todos los niveles);
+    los días sin ventas de una serie quedan en 0 y todas cubren el mismo rango.
+    """
+    cube = read_cube() if not cube_is_stale() else build_cube(read_features())
+    days = pd.date_range(cube['fecha'].min(), cube['fecha'].max(), freq='D')
+    series = {}
+    for level in levels:
+        wide = rollup(cube, [level, 'fecha'], [value])[value].unstack(level, fill_value=0)
+        wide.columns = wide.columns.astype(str)
+        series[level] = wide.reindex(days, fill_value=0)
+    return series
+
+
+@contextmanager
+def time_limit(seconds):
+    """Interrumpe el bloque con FitTimeout pasados `seconds` (solo donde existe SIGALRM)
+
+    En Windows no hay SIGALRM: el límite se revisa al terminar cada modelo.
+    """
+    if not seconds or not hasattr(signal, 'SIGALRM'):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise FitTimeout()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def fit_forecast(y, horizon, model, order=ORDER, seasonal_order=SEASONAL_ORDER):
+    """Pronóstico de `horizon` días de la serie `y` con uno de MODELS"""
+    if model == 'seasonal_naive':
+        return seasonal_naive(y, horizon)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        if model == 'sarima':
+            fitted = SARIMAX(y, order=order, seasonal_order=seasonal_order,
+                             trend=model_trend(order, seasonal_order)).fit(disp=False)
+        elif model == 'holt_winters':
+            fitted = ExponentialSmoothing(y, seasonal_periods=SEASONAL_PERIOD,
+                                          trend='add', seasonal='add').fit()
+        else:
+            raise ValueError(f"Modelo desconocido: {model}")
+    return np.asarray(fitted.forecast(horizon), dtype=np.float64)
+
+
+def fit_searched(y, horizon):
+    """SARIMA con el orden elegido por la búsqueda por pasos (secuencial, dentro del proceso)"""
+    result = search_order(y, workers=1)
+    forecast = fit_forecast(y, horizon, 'sarima', result['order'], result['seasonal_order'])
+    return forecast, format_order(result['order'], result['seasonal_order'])
+
+
+def forecast_series(y, horizon, models=MODELS, timeout=TIMEOUT, min_days=MIN_DAYS, search=False):
+    """Pronóstico de una serie con el primer modelo que funcione dentro del tiempo
+
+    Devuelve (pronóstico, modelo usado, orden SARIMA). Si un modelo falla, da
+    valores no finitos o agota el tiempo que queda, se prueba el siguiente.
+    Llamada directamente, una serie con menos de `min_days` días con ventas
+    pasa directo al último modelo; en forecast_batch esas series ni llegan
+    aquí: se quedan con el mejor pronóstico base de baselines.py. Con `search`
+    el orden de SARIMA se busca para cada serie (la búsqueda cuenta dentro del
+    mismo tiempo).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    if np.count_nonzero(y) < min_days:
+        models = models[-1:]
+    started = time.perf_counter()
+    for model in models:
+        remaining = timeout - (time.perf_counter() - started) if timeout else None
+        if model != models[-1] and remaining is not None and remaining <= 0:
+            continue
+        try:
+            with time_limit(remaining if model != models[-1] else None):
+                if model == 'sarima' and search:
+                    forecast, order = fit_searched(y, horizon)
+                else:
+                    forecast = fit_forecast(y, horizon, model)
+                    order = format_order(ORDER, SEASONAL_ORDER) if model == 'sarima' else ''
+        except Exception:
+            continue
+        if np.isfinite(forecast).all():
+            return forecast, model, order
+    return seasonal_naive(y, horizon), 'seasonal_naive', ''
+
+
+def forecast_chunk(values, horizon, models=MODELS, timeout=TIMEOUT, min_days=MIN_DAYS, search=False):
+    """Tarea del pool: pronostica cada fila de `values` (series x días)
+
+    Devuelve (pronósticos series x horizonte, modelo usado, orden SARIMA,
+    segundos por serie).
+    """
+    forecasts = np.empty((len(values), horizon))
+    used, orders, seconds = [], [], []
+    for i, y in enumerate(values):
+        started = time.perf_counter()
+        forecasts[i], model, order = forecast_series(y, horizon, models, timeout, min_days, search)
+        used.append(model)
+        orders.append(order)
+        seconds.append(time.perf_counter() - started)
+    return forecasts, used, orders, seconds
+
+
+def forecast_batch(series, horizon=HORIZON, workers=os.cpu_count(), models=MODELS, timeout=TIMEOUT,
+                   min_days=MIN_DAYS, chunk_size=CHUNK_SIZE, search=False, max_fits=None):
+    """Pronostica todas las columnas de `series` (fecha x serie) en paralelo
+
+    Primero todas las series reciben, en una sola pasada vectorizada, el
+    mejor pronóstico base de baselines.py. Luego solo las que tienen al menos
+    `min_days` días con ventas (y, con `max_fits`, solo esas tantas de mayor
+    venta) se ajustan con MODELS, repartidas en tareas de hasta `chunk_size`
+    para amortizar el envío al pool (más chicas si hace falta para dar trabajo
+    a todos los procesos). Devuelve la tabla larga (serie, fecha, pronostico,
+    modelo, orden, segundos) y las estadísticas de rendimiento: segundos de la
+    pasada base y del ajuste, y series ajustadas por segundo por núcleo. Con
+    `search` se busca el orden de SARIMA de cada serie.
+    """
+    values = series.to_numpy(dtype=np.float64).T
+    args = (horizon, models, timeout, min_days, search)
+
+    started = time.perf_counter()
+    forecasts, used, _ = best_baseline(values, horizon)
+    baseline_wall = time.perf_counter() - started
+    used = used.astype(object)
+    orders = np.full(len(values), '', dtype=object)
+    seconds = np.zeros(len(values))
+
+    fit = np.flatnonzero(np.count_nonzero(values, axis=1) >= min_days)
+    if max_fits is not None:
+        fit = fit[np.argsort(-values[fit].sum(axis=1), kind='stable')[:max_fits]]
+    workers = max(1, min(workers or 1, len(fit)))
+    chunk_size = max(1, min(chunk_size, math.ceil(len(fit) / workers)))
+    chunks = [fit[start:start + chunk_size] for start in range(0, len(fit), chunk_size)]
+
+    started = time.perf_counter()
+    if workers <= 1:
+        results = [forecast_chunk(values[chunk], *args) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(forecast_chunk, [values[chunk] for chunk in chunks],
+                                    *[[arg] * len(chunks) for arg in args]))
+    for chunk, (chunk_forecasts, chunk_used, chunk_orders, chunk_seconds) in zip(chunks, results):
+        forecasts[chunk] = chunk_forecasts
+        used[chunk] = chunk_used
+        orders[chunk] = chunk_orders
+        seconds[chunk] = chunk_seconds
+    fit_wall = time.perf_counter() - started
+
+    dates = pd.date_range(series.index[-1] + pd.Timedelta(days=1), periods=horizon, freq='D')
+    table = pd.DataFrame({
+        'serie': np.repeat(series.columns.to_numpy(), horizon),
+        'fecha': np.tile(dates, len(series.columns)),
+        'pronostico': forecasts.ravel(),
+        'modelo': np.repeat(used, horizon),
+        'orden': np.repeat(orders, horizon),
+        'segundos': np.repeat(seconds, horizon),
+    })
+    stats = {
+        'series': len(series.columns),
+        'ajustadas': len(fit),
+        'base_s': baseline_wall,
+        'ajuste_s': fit_wall,
+        'workers': workers,
+        'series_por_s_por_core': len(fit) / fit_wall / workers if len(fit) and fit_wall > 0 else float('nan'),
+    }
+    return table, stats
+
+
+def write_forecasts(tables, path=output_forecasts):
+    """Guarda en una sola tabla los pronósticos de todos los niveles ({nivel: tabla})"""
+    table = pd.concat([t.assign(nivel=level) for level, t in tables.items()], ignore_index=True)
+    table = table[['nivel', 'serie', 'fecha', 'pronostico', 'modelo', 'orden', 'segundos']]
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    table.to_parquet(path, index=False)
+    return table
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pronósticos por lotes por ruta, warehouse e item_code")
+    parser.add_argument('--levels', nargs='+', choices=SERIES_LEVELS, default=SERIES_LEVELS,
+                        help="Niveles de agregación de las series")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="Días a pronosticar")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Procesos para ajustar series en paralelo (1 = secuencial)")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT,
+                        help="Segundos máximos de ajuste por serie antes de usar la alternativa")
+    parser.add_argument('--min-days', type=int, default=MIN_DAYS,
+                        help="Días con ventas mínimos para ajustar un modelo "
+                             "(si no, el mejor pronóstico base vectorizado)")
+    parser.add_argument('--max-fits', type=int, default=None,
+                        help="Ajustar modelos de statsmodels solo en las N series con más ventas "
+                             "(el resto queda con el pronóstico base vectorizado)")
+    parser.add_argument('--search-order', action='store_true',
+                        help="Buscar el orden SARIMA de cada serie en vez de usar (1,1,1)x(1,1,1,7)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("📊 Armando series diarias...")
+    series = load_series(args.levels)
+
+    tables = {}
+    for level, wide in series.items():
+        print(f"\n🤖 {level}: {wide.shape[1]:,} series de {wide.shape[0]} días")
+        tables[level], stats = forecast_batch(wide, args.horizon, args.workers,
+                                              timeout=args.timeout, min_days=args.min_days,
+                                              search=args.search_order, max_fits=args.max_fits)
+        models = tables[level].drop_duplicates('serie')['modelo'].value_counts()
+        print(f"  ⚡ Pronósticos base: {stats['series']:,} series en {stats['base_s']:.2f} s")
+        print(f"  ⚡ Ajuste statsmodels: {stats['ajustadas']:,} series en {stats['ajuste_s']:.1f} s "
+              f"con {stats['workers']} procesos: {stats['series_por_s_por_core']:.2f} series/s por núcleo")
+        print(f"  Modelos usados: {models.to_dict()}")
+
+    write_forecasts(tables)
+    print(f"\n✅ Pronósticos guardados en: {output_forecasts}")
+
+
+if __name__ == '__main__':
+    main()
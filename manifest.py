@@ -0,0 +1,115 @@
+"""
+Manifiesto de limpieza incremental para GateGroup Airlines
+Registra hash de contenido, filas y reporte de cada archivo crudo ya procesado
+"""
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+# Rutas
+manifest_dir = r'Data\Clean\manifest'
+
+# Versión de los hashes de filas guardados (clean_data.row_fingerprints). Un manifiesto con otra
+# versión se descarta: sus hashes no se pueden comparar con los nuevos y el dataset se rehace completo
+FINGERPRINT_VERSION = 2
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash SHA-256 del contenido de un archivo, leído por bloques"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_id(path):
+    """Identificador estable de un archivo crudo (prefijo de sus particiones)"""
+    return hashlib.sha1(os.path.normpath(path).encode('utf-8')).hexdigest()[:12]
+
+
+class CleaningManifest:
+    """Estado de las corridas anteriores de la pipeline
+
+    Por cada archivo crudo guarda su hash, filas leídas y conservadas, los
+    duplicados descartados contra archivos anteriores y su sección del reporte.
+    Los hashes de las filas que aportó al dataset se guardan aparte (.npy) para
+    poder repetir la deduplicación entre archivos sin releer los ya procesados.
+    """
+
+    def __init__(self, path=manifest_dir):
+        self.path = path
+        self.files = {}
+        self.columns = []
+        manifest_file = os.path.join(path, 'manifest.json')
+        if os.path.isfile(manifest_file):
+            with open(manifest_file, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('fingerprint_version') == FINGERPRINT_VERSION:
+                self.files = data['files']
+                self.columns = data['columns']
+
+    def __len__(self):
+        return len(self.files)
+
+    def _fingerprint_path(self, path):
+        return os.path.join(self.path, f"{self.files[path]['file_id']}.npy")
+
+    def plan(self, files, hashes):
+        """Decide qué archivos hay que (re)limpiar
+
+        El orden de procesamiento es el del manifiesto seguido de los archivos
+        nuevos. Cuando un archivo es nuevo o cambió, él y todos los posteriores se
+        vuelven a limpiar: sus duplicados entre archivos pudieron depender de él.
+        Devuelve (rutas que se conservan, [(título, ruta)] a limpiar).
+        """
+        titles = {path: entry['title'] for path, entry in self.files.items()}
+        titles.update({path: title for title, path in files})
+        order = list(self.files) + [path for _, path in files if path not in self.files]
+
+        dirty = [i for i, path in enumerate(order)
+                 if path in hashes and (path not in self.files or self.files[path]['sha256'] != hashes[path])]
+        if not dirty:
+            return order, []
+
+        first = min(dirty)
+        for path in order[first:]:
+            if path not in hashes:
+                if not os.path.isfile(path):
+                    raise FileNotFoundError(
+                        f"Se necesita {path} para recalcular los duplicados entre archivos y no existe")
+                hashes[path] = file_sha256(path)
+        return order[:first], [(titles[path], path) for path in order[first:]]
+
+    def fingerprints(self, paths):
+        """Hashes (uint64 ordenados) de las filas aportadas por `paths`"""
+        arrays = [np.load(self._fingerprint_path(path)) for path in paths]
+        return np.unique(np.concatenate(arrays)) if arrays else np.empty(0, dtype=np.uint64)
+
+    def forget(self, path):
+        """Quita un archivo del manifiesto junto con sus hashes de filas"""
+        if path in self.files:
+            fingerprint_file = self._fingerprint_path(path)
+            if os.path.isfile(fingerprint_file):
+                os.remove(fingerprint_file)
+            del self.files[path]
+
+    def record(self, path, entry, fingerprints):
+        """Registra (o reemplaza) el resultado de limpiar un archivo"""
+        os.makedirs(self.path, exist_ok=True)
+        self.files[path] = entry
+        np.save(self._fingerprint_path(path), fingerprints)
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint_version': FINGERPRINT_VERSION, 'columns': self.columns, 'files': self.files},
+                      f, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def clear(path=manifest_dir):
+        """Descarta el manifiesto (p. ej. tras reescribir el dataset completo)"""
+        if os.path.isdir(path):
+            shutil.rmtree(path)
@@ -0,0 +1,191 @@
+"""
+Almacén de modelos SARIMA ajustados para GateGroup Airlines
+Guarda cada modelo con su ventana de entrenamiento y el hash de los datos; con días nuevos solo
+los filtra con los parámetros ya estimados y re-estima de forma programada o si detecta deriva
+
+Uso:
+    python model_store.py              # actualiza el modelo de ventas diarias y el forecast a 30 días
+    python model_store.py --refit      # fuerza la re-estimación completa
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import warnings
+import numpy as np
+import pandas as pd
+from statsmodels.iolib.smpickle import load_pickle
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from features import daily_series
+from forecasting import HORIZON, ORDER, SEASONAL_ORDER
+from order_search import SALES_SARIMA_KEY, format_order, model_trend, output_orders, read_orders
+from storage import read_clean_data
+
+# Rutas
+models_dir = r'Data\Clean\models'
+output_forecast = r'Data\Clean\forecast_ventas_30dias.csv'
+
+# Re-estimación programada: días nuevos desde el último ajuste completo
+REFIT_DAYS = 28
+
+# Deriva: con al menos DRIFT_MIN_DAYS días nuevos, se re-estima si los errores a un paso
+# estandarizados tienen sesgo (|media| * raíz(n) > DRIFT_BIAS) o escala mayor a DRIFT_SCALE
+DRIFT_MIN_DAYS = 7
+DRIFT_BIAS = 3.0
+DRIFT_SCALE = 2.0
+
+
+def series_sha256(y):
+    """Hash SHA-256 de las fechas y valores de una serie"""
+    digest = hashlib.sha256()
+    digest.update(y.index.asi8.tobytes())
+    digest.update(np.ascontiguousarray(y.to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def drift_statistics(results, start):
+    """Sesgo y escala de los errores a un paso estandarizados desde la posición `start`"""
+    z = np.asarray(results.standardized_forecasts_error)[0, start:]
+    z = z[np.isfinite(z)]
+    if len(z) == 0:
+        return 0.0, 0.0
+    return abs(z.mean()) * np.sqrt(len(z)), np.sqrt((z ** 2).mean())
+
+
+class ModelStore:
+    """Modelos SARIMA guardados en disco
+
+    Por cada nombre guarda los resultados ajustados (pickle de statsmodels,
+    con sus datos para poder agregar días) y un JSON con los órdenes, los
+    parámetros, la ventana de entrenamiento, el hash de los datos y la
+    fecha del último ajuste completo.
+    """
+
+    def __init__(self, path=models_dir):
+        self.path = path
+
+    def _paths(self, name):
+        return os.path.join(self.path, f"{name}.pkl"), os.path.join(self.path, f"{name}.json")
+
+    def load(self, name):
+        """(resultados, metadatos) guardados, o (None, None) si el modelo no existe"""
+        results_path, meta_path = self._paths(name)
+        if not (os.path.isfile(results_path) and os.path.isfile(meta_path)):
+            return None, None
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        return load_pickle(results_path), meta
+
+    def save(self, name, results, meta):
+        """Guarda resultados y metadatos (escritura a temporal y reemplazo, como features.arrow)"""
+        os.makedirs(self.path, exist_ok=True)
+        results_path, meta_path = self._paths(name)
+        tmp_path = f"{results_path}.{os.getpid()}.tmp"
+        results.save(tmp_path)
+        os.replace(tmp_path, results_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def fit_full(y, order, seasonal_order):
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return SARIMAX(y, order=order, seasonal_order=seasonal_order,
+                       trend=model_trend(order, seasonal_order)).fit(disp=False)
+
+
+def update_model(y, name, order=None, seasonal_order=None, store=None, refit=False,
+                 refit_days=REFIT_DAYS):
+    """Resultados SARIMA al día para la serie diaria `y`, usando el modelo guardado si sirve
+
+    Si el modelo guardado cubre una ventana cuyos datos no cambiaron (mismo
+    hash), los días nuevos solo se filtran con los parámetros existentes
+    (`append` sin re-estimar). Se re-estima todo cuando no hay modelo, cambian
+    los órdenes o los datos históricos, pasan `refit_days` días desde el
+    último ajuste completo, se detecta deriva en los errores a un paso o se
+    pide `refit`. Devuelve (resultados, estado) con la acción, el motivo y
+    los segundos.
+    """
+    started = time.perf_counter()
+    store = store or ModelStore()
+    y = y.asfreq('D', fill_value=0).astype(np.float64)
+    # Parquet entrega `fecha` en datetime64[us]; statsmodels solo reconoce que los días nuevos
+    # extienden el índice del modelo guardado si ambos están en ns
+    y.index = y.index.as_unit('ns')
+    results, meta = store.load(name)
+    order = tuple(order or (meta['order'] if meta else ORDER))
+    seasonal_order = tuple(seasonal_order or (meta['seasonal_order'] if meta else SEASONAL_ORDER))
+
+    reason = 'forzado' if refit else None
+    if reason is None and meta is None:
+        reason = 'sin modelo guardado'
+    elif reason is None and (order, seasonal_order) != (tuple(meta['order']), tuple(meta['seasonal_order'])):
+        reason = 'orden distinto'
+    elif reason is None:
+        window = y.loc[meta['inicio']:meta['fin']]
+        if str(y.index[0].date()) != meta['inicio'] or series_sha256(window) != meta['hash']:
+            reason = 'cambiaron los datos históricos'
+        elif (y.index[-1] - pd.Timestamp(meta['ajuste_completo'])).days >= refit_days:
+            reason = 'programado'
+
+    if reason is None:
+        new = y.loc[pd.Timestamp(meta['fin']) + pd.Timedelta(days=1):]
+        note = 'días nuevos filtrados con los parámetros guardados' if len(new) else 'sin días nuevos'
+        if len(new):
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                results = results.append(new)
+            bias, scale = drift_statistics(results, meta['n_ajuste'])
+            if len(y) - meta['n_ajuste'] >= DRIFT_MIN_DAYS and (bias > DRIFT_BIAS or scale > DRIFT_SCALE):
+                reason = f"deriva (sesgo {bias:.1f}, escala {scale:.1f})"
+        action = 'actualizado' if len(new) else 'sin cambios'
+
+    if reason is not None:
+        results = fit_full(y, order, seasonal_order)
+        action, note = 'ajustado', reason
+        meta = {'ajuste_completo': str(y.index[-1].date()), 'n_ajuste': len(y)}
+
+    meta.update({
+        'order': list(order),
+        'seasonal_order': list(seasonal_order),
+        'params': {k: float(v) for k, v in results.params.items()},
+        'inicio': str(y.index[0].date()),
+        'fin': str(y.index[-1].date()),
+        'n_obs': len(y),
+        'hash': series_sha256(y),
+        'actualizado_en': pd.Timestamp.now().isoformat(timespec='seconds'),
+    })
+    if action != 'sin cambios':
+        store.save(name, results, meta)
+    return results, {'accion': action, 'motivo': note, 'segundos': time.perf_counter() - started}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Actualiza el modelo SARIMA de ventas diarias y su forecast")
+    parser.add_argument('--horizon', type=int, default=HORIZON, help="Días a pronosticar")
+    parser.add_argument('--refit', action='store_true', help="Re-estimar el modelo completo")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("📊 Armando la serie diaria de ventas...")
+    ts_daily = daily_series(read_clean_data(columns=['fecha', 'sales', 'passengers', 'lost_sales', 'flight_key']))
+
+    # Orden elegido por la búsqueda (notebook o order_search.py), si existe
+    order, seasonal_order = read_orders().get(SALES_SARIMA_KEY, (None, None))
+    if order is None:
+        print(f"⚠️ No hay orden {SALES_SARIMA_KEY} guardado en {output_orders}: se usa el del modelo guardado "
+              f"o {format_order(ORDER, SEASONAL_ORDER)}")
+    results, status = update_model(ts_daily['sales'], 'ventas_diarias', order, seasonal_order, refit=args.refit)
+    print(f"🗄️ Modelo {status['accion']} ({status['motivo']}) en {status['segundos']:.1f} s")
+
+    forecast = results.forecast(steps=args.horizon)
+    df_forecast = pd.DataFrame({'fecha': forecast.index, 'ventas_predichas': forecast.to_numpy()})
+    df_forecast.to_csv(output_forecast, index=False)
+    print(f"✅ Forecast guardado en: {output_forecast}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+"""
+Búsqueda automática del orden (p,d,q)(P,D,Q,7) de los modelos ARIMA/SARIMA
+Búsqueda por pasos (stepwise) sobre el AIC: se ajustan en paralelo solo los vecinos del mejor modelo
+
+Uso:
+    python order_search.py                  # ventas diarias totales
+    python order_search.py --workers 4 --no-seasonal
+"""
+import argparse
+import ast
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.seasonal import seasonal_decompose
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from statsmodels.tsa.stattools import adfuller
+from features import daily_series
+from storage import read_clean_data
+
+# Rutas (junto a metricas_modelos.csv del notebook)
+output_orders = r'Data\Clean\orden_modelos.csv'
+output_search_trace = r'Data\Clean\busqueda_ordenes.csv'
+
+SEASONAL_PERIOD = 7
+
+# Claves de la serie de ventas diarias totales en orden_modelos.csv (las del notebook y de este CLI)
+SALES_ARIMA_KEY = 'ARIMA'
+SALES_SARIMA_KEY = 'SARIMA'
+
+# Límites de la búsqueda
+MAX_P, MAX_Q = 3, 3
+MAX_SEASONAL_P, MAX_SEASONAL_Q = 2, 2
+MAX_MODELS = 30
+MAXITER = 50
+
+# Una ronda debe bajar el AIC al menos esto para seguir buscando
+MIN_IMPROVEMENT = 2.0
+
+# Se descartan los ajustes con alguna raíz AR o MA de módulo menor a esto (en el borde de la
+# estacionariedad o invertibilidad, p. ej. AR≈1 cancelado con MA≈-1), como auto.arima en R
+MIN_ROOT_MODULUS = 1.01
+
+# Umbral de fuerza estacional para diferenciar una vez por semana (como nsdiffs en R)
+SEASONAL_STRENGTH = 0.64
+
+# Modelos iniciales (p, q, P, Q), los mismos que el algoritmo de Hyndman-Khandakar
+INITIAL_MODELS = [(2, 2, 1, 1), (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)]
+
+
+def seasonal_differences(y, period=SEASONAL_PERIOD):
+    """D = 1 si la estacionalidad explica la mayor parte de la variación sin tendencia"""
+    if len(y) < 2 * period or np.ptp(y) == 0:
+        return 0
+    parts = seasonal_decompose(y, model='additive', period=period)
+    resid = parts.resid[~np.isnan(parts.resid)]
+    detrended = (parts.seasonal + parts.resid)[~np.isnan(parts.resid)]
+    strength = max(0.0, 1 - resid.var() / detrended.var()) if detrended.var() > 0 else 0.0
+    return int(strength > SEASONAL_STRENGTH)
+
+
+def differences(y, max_d=2):
+    """d = número de diferencias hasta que la prueba ADF rechace la raíz unitaria (p <= 0.05)"""
+    d = 0
+    while d < max_d and len(y) > 10 and np.ptp(y) > 0:
+        try:
+            if adfuller(y, autolag='AIC')[1] <= 0.05:
+                break
+        except (ValueError, np.linalg.LinAlgError):
+            break
+        y = np.diff(y)
+        d += 1
+    return d
+
+
+def model_trend(order, seasonal_order):
+    """Tendencia de SARIMAX para un orden: constante si no hay diferencias (d + D == 0)
+
+    Sin constante, un modelo sin diferencias supone media cero y en una serie
+    de ventas (~20k diarias) el ajuste degenera. Todo lo que ajuste un orden
+    elegido por la búsqueda debe usar la misma tendencia.
+    """
+    return 'c' if order[1] + seasonal_order[1] == 0 else 'n'
+
+
+def is_degenerate(results):
+    """True si un ajuste no es válido para comparar su AIC
+
+    Se descarta si no convergió, si la log-verosimilitud es exactamente 0, si
+    algún parámetro no es finito o si alguna raíz AR/MA (incluidas las
+    estacionales) tiene módulo menor a MIN_ROOT_MODULUS.
+    """
+    if not results.mle_retvals.get('converged', True) or results.llf == 0:
+        return True
+    if not np.isfinite(np.asarray(results.params)).all():
+        return True
+    roots = np.concatenate([np.atleast_1d(results.arroots), np.atleast_1d(results.maroots)])
+    return bool(len(roots)) and bool(np.abs(roots).min() < MIN_ROOT_MODULUS)
+
+
+def fit_candidate(y, order, seasonal_order, maxiter=MAXITER):
+    """AIC de un candidato y segundos de ajuste (AIC infinito si el ajuste falla o es degenerado)"""
+    started = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            results = SARIMAX(y, order=order, seasonal_order=seasonal_order,
+                              trend=model_trend(order, seasonal_order)).fit(disp=False, maxiter=maxiter)
+        aic = np.inf if is_degenerate(results) else results.aic
+    except Exception:
+        aic = np.inf
+    return float(aic) if np.isfinite(aic) else np.inf, time.perf_counter() - started
+
+
+def neighbours(model, seasonal=True):
+    """Vecinos (p, q, P, Q) de un modelo: cada orden ±1 y p, q (o P, Q) juntos ±1"""
+    p, q, sp, sq = model
+    steps = [(1, 0, 0, 0), (0, 1, 0, 0), (1, 1, 0, 0)]
+    if seasonal:
+        steps += [(0, 0, 1, 0), (0, 0, 0, 1), (0, 0, 1, 1)]
+    limits = (MAX_P, MAX_Q, MAX_SEASONAL_P, MAX_SEASONAL_Q)
+    candidates = []
+    for step in steps:
+        for sign in (1, -1):
+            candidate = tuple(v + sign * s for v, s in zip(model, step))
+            if all(0 <= v <= limit for v, limit in zip(candidate, limits)):
+                candidates.append(candidate)
+    return candidates
+
+
+def format_order(order, seasonal_order):
+    return f"{tuple(order)}x{tuple(seasonal_order)}"
+
+
+def search_order(y, seasonal=True, period=SEASONAL_PERIOD, workers=os.cpu_count(),
+                 max_models=MAX_MODELS, maxiter=MAXITER, min_improvement=MIN_IMPROVEMENT):
+    """Orden ARIMA/SARIMA con menor AIC encontrado por pasos
+
+    d y D se fijan antes con pruebas (ADF y fuerza estacional), así todos los
+    AIC son comparables; sin diferencias los candidatos llevan constante (ver
+    model_trend) y los ajustes degenerados no cuentan. Se parte de cuatro
+    modelos iniciales; cada ronda ajusta en paralelo los vecinos aún no
+    probados del mejor modelo y la búsqueda se detiene cuando una ronda no
+    baja el AIC en `min_improvement` (una mejora menor igual se conserva) o
+    se llega a `max_models` ajustes.
+    Con `workers=1` todo corre en el proceso actual (p. ej. dentro de un
+    proceso del pool de forecasting.py).
+    """
+    y = np.asarray(y, dtype=np.float64)
+    started = time.perf_counter()
+    D = seasonal_differences(y, period) if seasonal else 0
+    d = differences(y[period:] - y[:-period] if D else y)
+
+    def orders(model):
+        p, q, sp, sq = model
+        return (p, d, q), (sp, D, sq, period) if seasonal else (0, 0, 0, 0)
+
+    initial = INITIAL_MODELS if seasonal else [(p, q, 0, 0) for p, q, _, _ in INITIAL_MODELS]
+    tried, trace = {}, []
+    best, rounds = None, 0
+    pool = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    try:
+        candidates = initial
+        while len(tried) < max_models:
+            candidates = [c for c in dict.fromkeys(candidates) if c not in tried][:max_models - len(tried)]
+            if not candidates:
+                break
+            rounds += 1
+            pairs = [orders(c) for c in candidates]
+            args = ([y] * len(pairs), [o for o, _ in pairs], [s for _, s in pairs], [maxiter] * len(pairs))
+            results = list(pool.map(fit_candidate, *args)) if pool else list(map(fit_candidate, *args))
+            for candidate, (order, seasonal_order), (aic, seconds) in zip(candidates, pairs, results):
+                tried[candidate] = aic
+                trace.append({'ronda': rounds, 'order': str(order), 'seasonal_order': str(seasonal_order),
+                              'aic': aic, 'segundos': seconds})
+            round_best = min(candidates, key=tried.get)
+            stop = best is not None and not tried[round_best] < tried[best] - min_improvement
+            if best is None or tried[round_best] < tried[best]:
+                best = round_best
+            if stop:
+                break
+            candidates = neighbours(best, seasonal)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    if not np.isfinite(tried[best]):
+        raise ValueError(f"Ningún candidato de los {len(tried)} ajustados dio un modelo válido")
+    order, seasonal_order = orders(best)
+    return {
+        'order': order,
+        'seasonal_order': seasonal_order,
+        'aic': tried[best],
+        'modelos': len(tried),
+        'rondas': rounds,
+        'segundos': time.perf_counter() - started,
+        'traza': pd.DataFrame(trace),
+    }
+
+
+def merge_csv(df, path):
+    """Reemplaza en el CSV de `path` las filas de las series de `df` y conserva las demás"""
+    if os.path.isfile(path):
+        previous = pd.read_csv(path)
+        df = pd.concat([previous[~previous['serie'].isin(df['serie'])], df], ignore_index=True)
+    df.to_csv(path, index=False)
+    return df
+
+
+def write_search(results, path=output_orders, trace_path=output_search_trace):
+    """Guarda el orden elegido por serie ({serie: resultado}) y la traza de candidatos ajustados
+
+    Las filas de otras series ya guardadas (p. ej. las del notebook) se conservan.
+    """
+    summary = pd.DataFrame([{
+        'serie': name,
+        'order': str(r['order']),
+        'seasonal_order': str(r['seasonal_order']),
+        'aic': r['aic'],
+        'modelos': r['modelos'],
+        'rondas': r['rondas'],
+        'segundos': r['segundos'],
+    } for name, r in results.items()])
+    trace = pd.concat([r['traza'].assign(serie=name) for name, r in results.items()], ignore_index=True)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    merge_csv(trace, trace_path)
+    return merge_csv(summary, path)
+
+
+def read_orders(path=output_orders):
+    """Órdenes guardados con write_search: {serie: (order, seasonal_order)} (vacío si no hay archivo)"""
+    if not os.path.isfile(path):
+        return {}
+    summary = pd.read_csv(path)
+    return {row.serie: (ast.literal_eval(row.order), ast.literal_eval(row.seasonal_order))
+            for row in summary.itertuples()}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Búsqueda por pasos del orden ARIMA/SARIMA de las ventas diarias")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="Procesos para ajustar los candidatos de cada ronda (1 = secuencial)")
+    parser.add_argument('--max-models', type=int, default=MAX_MODELS, help="Máximo de modelos a ajustar")
+    parser.add_argument('--no-seasonal', dest='seasonal', action='store_false',
+                        help="Buscar solo (p,d,q), sin componente estacional semanal")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("📊 Armando la serie diaria de ventas...")
+    ts_daily = daily_series(read_clean_data(columns=['fecha', 'sales', 'passengers', 'lost_sales', 'flight_key']))
+
+    print("🔎 Buscando orden...")
+    result = search_order(ts_daily['sales'], seasonal=args.seasonal, workers=args.workers,
+                          max_models=args.max_models)
+    print(f"✅ {format_order(result['order'], result['seasonal_order'])} con AIC {result['aic']:,.1f}: "
+          f"{result['modelos']} modelos en {result['rondas']} rondas ({result['segundos']:.1f} s)")
+    write_search({SALES_SARIMA_KEY if args.seasonal else SALES_ARIMA_KEY: result})
+    print(f"✅ Orden guardado en: {output_orders}")
+
+
+if __name__ == '__main__':
+    main()
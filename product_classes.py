@@ -0,0 +1,69 @@
+"""
+Clasificación de productos (matriz BCG simplificada) para GateGroup Airlines
+Calcula la etiqueta una vez por item_code y la reparte a las filas como código categórico
+"""
+import numpy as np
+import pandas as pd
+
+# Clases en el orden de sus códigos categóricos
+PRODUCT_CLASSES = ['Star ⭐', 'Cash Cow 💰', 'Question Mark ❓', 'Dog 🐕']
+DOG = PRODUCT_CLASSES.index('Dog 🐕')
+
+# Umbrales por defecto sobre el ranking percentil de ventas y de frecuencia del item
+SALES_THRESHOLD = 0.7
+FREQ_THRESHOLD = 0.7
+
+
+def classify(sales_rank, freq_rank, sales_threshold=SALES_THRESHOLD, freq_threshold=FREQ_THRESHOLD):
+    """Código de clase (índice en PRODUCT_CLASSES) para cada par de rankings
+
+    Star: ventas y frecuencia altas; Cash Cow: solo ventas altas; Question
+    Mark: solo frecuencia alta; Dog: ninguna (también si el ranking es nulo).
+    """
+    high_sales = np.asarray(sales_rank, dtype=np.float64) >= sales_threshold
+    high_freq = np.asarray(freq_rank, dtype=np.float64) >= freq_threshold
+    return np.where(high_sales, np.where(high_freq, 0, 1), np.where(high_freq, 2, 3)).astype(np.int8)
+
+
+def item_ranks(item_code, sales, weights=None):
+    """Ranking percentil de ventas totales y de número de filas de cada item_code
+
+    Devuelve (códigos por fila, rankings de ventas, rankings de frecuencia). Los
+    rankings tienen un elemento por item más un NaN final, de modo que
+    `rank[códigos]` reparte el valor a cada fila y las filas sin item_code
+    (código -1) quedan en NaN. Con datos ya agregados, `weights` indica
+    cuántas filas representa cada una.
+    """
+    codes, items = pd.factorize(item_code)
+    valid = codes >= 0
+    sales = np.nan_to_num(np.asarray(sales, dtype=np.float64)[valid])
+    totals = np.bincount(codes[valid], weights=sales, minlength=len(items))
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)[valid]
+    counts = np.bincount(codes[valid], weights=weights, minlength=len(items))
+
+    sales_rank = pd.Series(totals).rank(pct=True).to_numpy()
+    freq_rank = pd.Series(counts).rank(pct=True).to_numpy()
+    return codes, np.append(sales_rank, np.nan), np.append(freq_rank, np.nan)
+
+
+def to_categorical(codes):
+    """Etiquetas de PRODUCT_CLASSES a partir de sus códigos"""
+    return pd.Categorical.from_codes(codes, categories=PRODUCT_CLASSES)
+
+
+def classify_rows(sales_rank, freq_rank, sales_threshold=SALES_THRESHOLD, freq_threshold=FREQ_THRESHOLD):
+    """Clase de cada fila a partir de rankings ya calculados (p. ej. con otros umbrales)"""
+    return to_categorical(classify(sales_rank, freq_rank, sales_threshold, freq_threshold))
+
+
+def classify_products(item_code, sales, sales_threshold=SALES_THRESHOLD, freq_threshold=FREQ_THRESHOLD,
+                      weights=None):
+    """Clase de cada fila con rankings calculados sobre estas mismas filas
+
+    Sirve tanto para el dataset completo como para la selección actual de
+    filtros: el costo es un conteo por item (bincount) y una indexación.
+    """
+    codes, sales_rank, freq_rank = item_ranks(item_code, sales, weights)
+    item_class = classify(sales_rank, freq_rank, sales_threshold, freq_threshold)
+    return to_categorical(item_class[codes])
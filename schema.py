@@ -0,0 +1,157 @@
+"""
+Esquema de los archivos crudos de GateGroup Airlines
+Declara el tipo de cada una de las 17 columnas para leer los CSV ya tipados
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# Tipos del dataset limpio (nombres de columna ya normalizados)
+DATETIME_COLS = ['fecha', 'departute_local_time', 'arrival_local_time']
+INT_COLS = {'passengers': 'int32', 'item_code': 'int32'}
+FLOAT_COLS = {'sales': 'float64', 'lost_sales': 'float64'}
+STRING_COLS = ['flight_key', 'flight_no']
+CATEGORY_COLS = ['nombre_de_aerolinea', 'origen', 'destino', 'type_transaction',
+                 'category', 'supercategory', 'currency', 'warehouse']
+
+# Tipos de lectura de las 17 columnas del CSV crudo. Los enteros admiten nulos
+# (se eliminan en el paso 5) y item_code llega como "1086.0", por eso float32,
+# exacto para los códigos. Solo `fecha` se parsea al leer: las horas locales se
+# conservan como texto para que el reporte y el CSV limpio no cambien.
+RAW_SCHEMA = {
+    'flight_key': 'string',
+    'passengers': 'int32',
+    'nombre_de_aerolinea': 'category',
+    'fecha': 'datetime',
+    'origen': 'category',
+    'destino': 'category',
+    'flight_no': 'string',
+    'departute_local_time': 'string',
+    'arrival_local_time': 'string',
+    'sales': 'float64',
+    'type_transaction': 'category',
+    'category': 'category',
+    'supercategory': 'category',
+    'lost_sales': 'float64',
+    'item_code': 'float32',
+    'currency': 'category',
+    'warehouse': 'category',
+}
+
+# Equivalencias para el lector de pyarrow (archivo completo) y el de pandas (por bloques)
+ARROW_TYPES = {
+    'string': pa.string(),
+    'category': pa.dictionary(pa.int32(), pa.string()),
+    # En ns, como los lectores de pandas: el mismo archivo da los mismos tipos en cualquier modo
+    'datetime': pa.timestamp('ns'),
+    'int32': pa.int32(),
+    'float32': pa.float32(),
+    'float64': pa.float64(),
+}
+PANDAS_TYPES = {'string': 'str', 'category': 'category', 'int32': 'Int32',
+                'float32': 'float32', 'float64': 'float64'}
+
+# Mismos valores nulos que reconoce pd.read_csv por defecto (copiados de su documentación
+# para no depender de un módulo privado de pandas)
+NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+             '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+
+def normalize_column_name(name):
+    """Nombre de columna normalizado (minúsculas, sin espacios extremos, '_' por ' ')"""
+    return name.strip().lower().replace(' ', '_')
+
+
+def raw_schema(path):
+    """Tipo declarado de cada columna del archivo, indexado por su encabezado original"""
+    header = pd.read_csv(path, nrows=0).columns
+    return {col: RAW_SCHEMA[normalize_column_name(col)]
+            for col in header if normalize_column_name(col) in RAW_SCHEMA}
+
+
+def _sort_categories(df):
+    # pyarrow arma el diccionario en orden de aparición; se ordena como lo haría astype('category')
+    for col in df.select_dtypes('category').columns:
+        df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def _read_arrow(path, schema):
+    convert = pacsv.ConvertOptions(
+        column_types={col: ARROW_TYPES[kind] for col, kind in schema.items()},
+        null_values=NA_VALUES, strings_can_be_null=True)
+    table = pacsv.read_csv(path, convert_options=convert)
+    return _sort_categories(table.to_pandas(types_mapper={pa.int32(): pd.Int32Dtype()}.get))
+
+
+def _pandas_options(schema, typed=True):
+    """Argumentos de pd.read_csv; con typed=False solo se declaran texto y categorías"""
+    kinds = ('string', 'category') if not typed else tuple(PANDAS_TYPES)
+    dtype = {col: PANDAS_TYPES[kind] for col, kind in schema.items() if kind in kinds}
+    dates = [col for col, kind in schema.items() if kind == 'datetime'] if typed else None
+    return {'dtype': dtype, 'parse_dates': dates}
+
+
+def _iter_chunks(path, schema, chunksize):
+    """Bloques tipados; si un bloque no respeta el esquema, el resto se lee sin tipos numéricos"""
+    emitted = 0
+    try:
+        with pd.read_csv(path, chunksize=chunksize, **_pandas_options(schema)) as reader:
+            for chunk in reader:
+                emitted += len(chunk)
+                yield chunk
+    except (ValueError, TypeError):
+        with pd.read_csv(path, chunksize=chunksize, skiprows=range(1, emitted + 1),
+                         **_pandas_options(schema, typed=False)) as reader:
+            yield from reader
+
+
+def coerce_to_schema(chunk, schema):
+    """Convierte al tipo declarado las columnas numéricas y de fecha que llegaron sin tipo
+
+    Sirve para los bloques del lector sin tipos: así todos los bloques de un
+    archivo tienen los mismos dtypes. Los valores que no se pueden convertir
+    (o decimales en una columna entera) quedan nulos. Devuelve (bloque,
+    {columna: valores no convertibles}).
+    """
+    invalid = {}
+    for col, kind in schema.items():
+        if col not in chunk.columns or kind in ('string', 'category'):
+            continue
+        series = chunk[col]
+        if kind == 'datetime':
+            if pd.api.types.is_datetime64_any_dtype(series):
+                continue
+            values = pd.to_datetime(series, errors='coerce')
+        else:
+            if str(series.dtype) == PANDAS_TYPES[kind]:
+                continue
+            values = pd.to_numeric(series, errors='coerce')
+            if kind == 'int32':
+                values = values.where(values % 1 == 0)
+            values = values.astype(PANDAS_TYPES[kind])
+        invalid[col] = int((series.notna() & values.isna()).sum())
+        chunk[col] = values
+    return chunk, invalid
+
+
+def read_raw_csv(path, chunksize=None, nrows=None):
+    """Lee un CSV crudo aplicando el esquema declarado
+
+    Las dimensiones llegan como category, `fecha` como datetime y los numéricos
+    ya convertidos y reducidos. El archivo completo se lee con el lector CSV de
+    pyarrow (multihilo, sin pasar por objetos de Python); `chunksize` y `nrows`
+    usan el lector de pandas con los mismos tipos. Si algún valor no respeta el
+    esquema se lee sin los tipos numéricos ni de fecha y el paso 2 de la
+    pipeline los convierte con `errors='coerce'`, igual que antes.
+    """
+    schema = raw_schema(path)
+    if chunksize:
+        return _iter_chunks(path, schema, chunksize)
+
+    try:
+        if nrows:
+            return pd.read_csv(path, nrows=nrows, **_pandas_options(schema))
+        return _read_arrow(path, schema)
+    except (ValueError, TypeError, pa.ArrowInvalid):
+        return pd.read_csv(path, nrows=nrows, **_pandas_options(schema, typed=False))
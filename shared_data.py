@@ -0,0 +1,74 @@
+"""
+Dataset compartido del dashboard de GateGroup Airlines
+Guarda las variables materializadas en un archivo Arrow que cada proceso abre mapeado en memoria
+
+Uso:
+    python shared_data.py    # exporta Data/Clean/features.arrow desde el Parquet de variables
+"""
+import os
+import time
+import pyarrow as pa
+from features import output_features, read_features
+
+# Rutas
+output_arrow = r'Data\Clean\features.arrow'
+
+
+def write_arrow(df, path=output_arrow):
+    """Escribe el dataset como Arrow IPC sin compresión (los buffers se pueden mapear tal cual)
+
+    Se escribe a un archivo temporal y se reemplaza al final, así un proceso
+    que abre el archivo nunca ve una escritura a medias.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return table.num_rows
+
+
+def open_arrow(path=output_arrow):
+    """Tabla Arrow respaldada por el archivo mapeado en memoria (sin leerlo ni copiarlo)"""
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def arrow_is_stale(source=output_features, path=output_arrow):
+    """True si falta el archivo Arrow o es más viejo que el Parquet de variables"""
+    if not os.path.isfile(path):
+        return True
+    source_mtime = max((os.path.getmtime(os.path.join(root, name))
+                        for root, _, names in os.walk(source) for name in names), default=0.0)
+    return source_mtime > os.path.getmtime(path)
+
+
+def load_shared(source=output_features, path=output_arrow):
+    """DataFrame de solo lectura sobre el archivo Arrow mapeado (lo exporta primero si hace falta)
+
+    Con `split_blocks` las columnas numéricas sin nulos quedan como vistas de
+    las páginas mapeadas: todos los procesos comparten esa memoria a través
+    de la caché del sistema operativo. Las columnas de texto y categóricas se
+    convierten una vez por proceso. Quien use el resultado no debe
+    modificarlo (las vistas mapeadas son de solo lectura).
+    """
+    if arrow_is_stale(source, path):
+        df = read_features(source)
+        try:
+            write_arrow(df, path)
+        except OSError:
+            # Otro proceso tiene el archivo abierto (p. ej. en Windows): se usa lo ya leído
+            return df
+    return open_arrow(path).to_pandas(split_blocks=True, self_destruct=False)
+
+
+def main():
+    print("⚙️ Exportando variables a Arrow para el dashboard...")
+    started = time.perf_counter()
+    rows = write_arrow(read_features())
+    print(f"✅ {rows:,} filas guardadas en: {output_arrow} ({time.perf_counter() - started:.1f} s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Almacenamiento columnar del dataset limpio para GateGroup Airlines
+Escribe y lee Parquet particionado por mes de `fecha` con columnas tipadas
+"""
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from schema import CATEGORY_COLS, DATETIME_COLS, FLOAT_COLS, INT_COLS, STRING_COLS
+
+# Rutas
+output_parquet = r'Data\Clean\cleaned_data_parquet'
+
+# Columna de partición (carpetas periodo=YYYY-MM)
+PARTITION_COL = 'periodo'
+
+
+def to_typed(df):
+    """Convierte el dataset limpio a sus tipos finales (datetime, int, float, category)"""
+    df = df.copy()
+    for col in DATETIME_COLS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    for col, dtype in {**INT_COLS, **FLOAT_COLS}.items():
+        if col in df.columns:
+            df[col] = df[col].astype(dtype)
+    for col in STRING_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype(str)
+    for col in CATEGORY_COLS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
+
+
+class ParquetPartitionWriter:
+    """Escribe el dataset limpio como Parquet particionado por mes de `fecha`
+
+    Cada llamada a `write` agrega un archivo por mes presente en el bloque,
+    por lo que sirve tanto para el modo completo como para el modo streaming.
+    Con `append=True` se conserva el dataset existente y los archivos nuevos
+    llevan el prefijo `prefix` (p. ej. el id del archivo crudo de origen).
+    """
+
+    def __init__(self, path=output_parquet, append=False, prefix='part'):
+        self.path = path
+        self.prefix = prefix
+        self.rows = 0
+        self._parts = 0
+        if os.path.isdir(path) and not append:
+            shutil.rmtree(path)
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, df):
+        df = to_typed(df)
+        months = df['fecha'].dt.strftime('%Y-%m')
+        for month, part in df.groupby(months, sort=True):
+            folder = os.path.join(self.path, f"{PARTITION_COL}={month}")
+            os.makedirs(folder, exist_ok=True)
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            pq.write_table(table, os.path.join(folder, f"{self.prefix}-{self._parts:05d}.parquet"))
+            self._parts += 1
+        self.rows += len(df)
+
+    def close(self):
+        pass
+
+
+def remove_parts(prefix, path=output_parquet):
+    """Elimina del dataset los archivos escritos con `prefix` (en todas las particiones)"""
+    removed = 0
+    if not os.path.isdir(path):
+        return removed
+    for folder in os.listdir(path):
+        folder_path = os.path.join(path, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for name in os.listdir(folder_path):
+            if name.startswith(f"{prefix}-"):
+                os.remove(os.path.join(folder_path, name))
+                removed += 1
+        if not os.listdir(folder_path):
+            os.rmdir(folder_path)
+    return removed
+
+
+def list_months(path=output_parquet):
+    """Meses (YYYY-MM) disponibles en el dataset particionado"""
+    prefix = f"{PARTITION_COL}="
+    return sorted(name[len(prefix):] for name in os.listdir(path) if name.startswith(prefix))
+
+
+def read_clean_data(path=output_parquet, columns=None, months=None):
+    """Carga el dataset limpio desde Parquet
+
+    Solo se leen las columnas de `columns` y las particiones de `months`
+    (lista de 'YYYY-MM'); los tipos llegan ya convertidos, sin parsear texto.
+    """
+    filters = [(PARTITION_COL, 'in', list(months))] if months else None
+    table = pq.read_table(path, columns=columns, filters=filters, partitioning='hive')
+    df = table.to_pandas()
+    if PARTITION_COL in df.columns and (columns is None or PARTITION_COL not in columns):
+        df = df.drop(columns=PARTITION_COL)
+    return df
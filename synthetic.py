@@ -0,0 +1,169 @@
+"""
+Generador de datos sintéticos con el formato de los CSV crudos de GateGroup Airlines
+Reproduce las 17 columnas, cardinalidades, tasas de nulos y de negativos y el rango de fechas reales
+
+Uso:
+    python synthetic.py 1000000 Data/Raw/synthetic_1M.csv
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from schema import RAW_SCHEMA
+
+# Periodo de los extractos reales (archivo A: ene-abr, archivo B: may-ago)
+DATE_START = '2025-01-01'
+DATE_END = '2025-08-30'
+
+# Filas de venta por vuelo (un renglón por producto vendido o perdido)
+ROWS_PER_FLIGHT = 20
+
+# Dimensiones con cardinalidades del orden de las del dataset real
+AIRLINES = ['Aeromexico', 'Air Europa', 'British Airways', 'Delta Air Lines', 'Emirates',
+            'Iberia', 'Lufthansa', 'Qatar Airways', 'Swiss', 'Vueling']
+AIRPORTS = ['AMS', 'ATL', 'BCN', 'BOG', 'CDG', 'CUN', 'DOH', 'DXB', 'FCO', 'FRA',
+            'GDL', 'IST', 'JFK', 'LAX', 'LHR', 'LIS', 'MAD', 'MEX', 'MIA', 'MTY',
+            'MUC', 'ORD', 'PMI', 'SCL', 'SFO', 'TIJ', 'VIE', 'YYZ', 'ZRH', 'GRU']
+TRANSACTION_TYPES = ['Retail', 'Pre-order', 'Complimentary']
+CURRENCIES = ['EUR', 'USD', 'GBP', 'MXN', 'CHF']
+WAREHOUSES = ['BCN01', 'DXB02', 'FRA01', 'LHR03', 'MAD01', 'MEX02', 'MTY01', 'ZRH01']
+CATEGORIES = {
+    'Food': ['Sandwiches', 'Hot Meals', 'Salads', 'Snacks'],
+    'Beverages': ['Soft Drinks', 'Hot Drinks', 'Water', 'Juices'],
+    'Alcohol': ['Beer', 'Wine', 'Spirits'],
+    'Duty Free': ['Fragrances', 'Cosmetics', 'Accessories'],
+}
+N_ITEMS = 600
+FIRST_ITEM_CODE = 1000
+
+# Tasas por fila tomadas de cleaning_report.txt (promedio de los archivos A y B)
+NULL_RATES = {
+    'route': 0.0013,                 # origen y destino faltan juntos
+    'departute_local_time': 0.008,
+    'product': 0.00005,              # category, supercategory e item_code
+    'warehouse': 0.00001,
+    'sales': 0.0135,                 # el paso 4 también descarta las ventas nulas
+}
+NEGATIVE_RATES = {'passengers': 0.0009, 'sales': 0.0057}
+
+
+def _flights(n_flights, rng):
+    """Tabla de vuelos ordenada por fecha; cada fila de venta hereda los datos de su vuelo"""
+    start, end = pd.Timestamp(DATE_START), pd.Timestamp(DATE_END)
+    days = (end - start).days + 1
+    fecha = start + pd.to_timedelta(np.arange(n_flights) * days // max(n_flights, 1), unit='D')
+
+    origen = rng.integers(0, len(AIRPORTS), n_flights)
+    destino = (origen + rng.integers(1, len(AIRPORTS), n_flights)) % len(AIRPORTS)
+    departure = fecha + pd.to_timedelta(rng.integers(5 * 60, 23 * 60, n_flights), unit='min')
+    arrival = departure + pd.to_timedelta(rng.integers(45, 12 * 60, n_flights), unit='min')
+    airline = rng.integers(0, len(AIRLINES), n_flights)
+    flight_no = np.char.add(np.array([name[:2].upper() for name in AIRLINES])[airline],
+                            rng.integers(100, 9999, n_flights).astype(str))
+
+    return pd.DataFrame({
+        'flight_key': np.char.add(np.char.add(flight_no, '_'), fecha.strftime('%Y%m%d').to_numpy(dtype=str)),
+        'passengers': rng.integers(3, 366, n_flights),
+        'nombre_de_aerolinea': np.array(AIRLINES)[airline],
+        'fecha': fecha.strftime('%Y-%m-%d'),
+        'origen': np.array(AIRPORTS)[origen],
+        'destino': np.array(AIRPORTS)[destino],
+        'flight_no': flight_no,
+        'departute_local_time': departure.strftime('%Y-%m-%d %H:%M:%S'),
+        'arrival_local_time': arrival.strftime('%Y-%m-%d %H:%M:%S'),
+        'currency': rng.choice(CURRENCIES, n_flights, p=[0.45, 0.3, 0.1, 0.1, 0.05]),
+        'warehouse': np.array(WAREHOUSES)[rng.integers(0, len(WAREHOUSES), n_flights)],
+    })
+
+
+def _items(rng):
+    """Catálogo de productos: código, categoría, supercategoría y precio"""
+    pairs = [(sup, cat) for sup, cats in CATEGORIES.items() for cat in cats]
+    pair = rng.integers(0, len(pairs), N_ITEMS)
+    return pd.DataFrame({
+        'item_code': np.arange(FIRST_ITEM_CODE, FIRST_ITEM_CODE + N_ITEMS),
+        'supercategory': [pairs[p][0] for p in pair],
+        'category': [pairs[p][1] for p in pair],
+        'price': rng.choice([2.0, 3.5, 5.0, 7.5, 10.0, 15.0, 25.0, 40.0], N_ITEMS),
+        # Popularidad tipo Zipf: pocos productos concentran la mayoría de las ventas
+        'weight': 1.0 / np.arange(1, N_ITEMS + 1),
+    })
+
+
+def _with_nulls(values, rate, rng):
+    values = pd.Series(values, dtype=object if values.dtype.kind in 'OU' else 'float64')
+    values[rng.random(len(values)) < rate] = np.nan
+    return values
+
+
+def generate_chunk(flights, items, start, stop, n_rows, rng):
+    """Filas crudas [start, stop) del dataset sintético de `n_rows` filas"""
+    rows = np.arange(start, stop)
+    n = len(rows)
+    df = flights.iloc[rows * len(flights) // n_rows].reset_index(drop=True)
+
+    weight = items['weight'].to_numpy()
+    item = rng.choice(len(items), n, p=weight / weight.sum())
+    units = rng.integers(1, 5, n)
+    sales = items['price'].to_numpy()[item] * units
+    sold = rng.random(n) < 0.8
+    df['sales'] = np.where(sold, sales, 0.0)
+    df['lost_sales'] = np.where(sold, 0.0, sales)
+    df['type_transaction'] = rng.choice(TRANSACTION_TYPES, n, p=[0.85, 0.1, 0.05])
+    df['category'] = items['category'].to_numpy()[item]
+    df['supercategory'] = items['supercategory'].to_numpy()[item]
+    # item_code llega como "1086.0" en los extractos reales
+    df['item_code'] = items['item_code'].to_numpy()[item].astype('float64')
+
+    # Valores negativos (pasajeros y ventas) y nulos con las tasas observadas
+    passengers = df['passengers'].to_numpy().copy()
+    passengers[rng.random(n) < NEGATIVE_RATES['passengers']] *= -1
+    df['passengers'] = passengers
+    negative = rng.random(n) < NEGATIVE_RATES['sales']
+    df.loc[negative, 'sales'] = -df.loc[negative, 'sales'].abs() - 1.0
+    df['sales'] = _with_nulls(df['sales'].to_numpy(), NULL_RATES['sales'], rng)
+
+    route_null = rng.random(n) < NULL_RATES['route']
+    df.loc[route_null, ['origen', 'destino']] = np.nan
+    df['departute_local_time'] = _with_nulls(df['departute_local_time'].to_numpy(),
+                                             NULL_RATES['departute_local_time'], rng)
+    product_null = rng.random(n) < NULL_RATES['product']
+    df.loc[product_null, ['category', 'supercategory', 'item_code']] = np.nan
+    df['warehouse'] = _with_nulls(df['warehouse'].to_numpy(), NULL_RATES['warehouse'], rng)
+
+    return df[list(RAW_SCHEMA)]
+
+
+def write_synthetic_csv(path, n_rows, seed=0, chunk_rows=1_000_000):
+    """Escribe un CSV crudo sintético de `n_rows` filas, por bloques (memoria acotada)
+
+    Las filas quedan ordenadas por fecha, como los extractos reales. Con la
+    misma semilla y el mismo número de filas el archivo es idéntico.
+    """
+    rng = np.random.default_rng(seed)
+    flights = _flights(max(n_rows // ROWS_PER_FLIGHT, 1), rng)
+    items = _items(rng)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    for start in range(0, n_rows, chunk_rows):
+        stop = min(start + chunk_rows, n_rows)
+        chunk = generate_chunk(flights, items, start, stop, n_rows, np.random.default_rng([seed, start]))
+        chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+    if n_rows == 0:
+        pd.DataFrame(columns=list(RAW_SCHEMA)).to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un CSV crudo sintético de GateGroup Airlines")
+    parser.add_argument('rows', type=int, help="Número de filas a generar")
+    parser.add_argument('path', help="Ruta del CSV de salida")
+    parser.add_argument('--seed', type=int, default=0, help="Semilla del generador")
+    args = parser.parse_args(argv)
+
+    write_synthetic_csv(args.path, args.rows, args.seed)
+    print(f"✅ {args.rows:,} filas sintéticas guardadas en: {args.path}")
+
+
+if __name__ == '__main__':
+    main()
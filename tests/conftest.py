@@ -0,0 +1,39 @@
+"""
+Datos compartidos por las pruebas: CSV crudos sintéticos con el formato de los extractos reales
+"""
+import os
+import sys
+import pandas as pd
+import pytest
+
+# Los módulos del proyecto viven en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import write_synthetic_csv  # noqa: E402
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Corre la prueba dentro de tmp_path: las rutas relativas de los módulos (Data\\Clean\\...) quedan ahí"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(os.path.join('Data', 'Clean'), exist_ok=True)
+    return tmp_path
+
+
+@pytest.fixture
+def raw_files(workdir):
+    """Tres CSV crudos: A, B (con un `passengers` mal formado, que lo manda al lector sin tipos)
+    y C (200 filas copiadas de A). B también repite filas de A para que haya duplicados entre archivos.
+    """
+    path_a = write_synthetic_csv(str(workdir / 'a.csv'), 6000, seed=1)
+    path_b = write_synthetic_csv(str(workdir / 'b.csv'), 4000, seed=2)
+    a = pd.read_csv(path_a, dtype=str, keep_default_na=False)
+    b = pd.read_csv(path_b, dtype=str, keep_default_na=False)
+
+    b = pd.concat([b, a.iloc[1000:1300]], ignore_index=True)
+    b.loc[len(b) - 1, 'passengers'] = 'n/d'
+    b.to_csv(path_b, index=False)
+
+    path_c = str(workdir / 'c.csv')
+    a.iloc[3000:3200].to_csv(path_c, index=False)
+    return {'A': path_a, 'B': path_b, 'C': path_c}
@@ -0,0 +1,51 @@
+"""
+Hashes de fila canónicos: la misma fila da el mismo hash con cualquier lector del CSV crudo
+"""
+import numpy as np
+import pandas as pd
+from clean_data import DataCleaningPipeline, RowFingerprints, output_parquet, row_fingerprints, run_in_memory
+from schema import read_raw_csv
+from storage import read_clean_data
+
+
+def _steps_1_2(df):
+    pipeline = DataCleaningPipeline(verbose=False)
+    return pipeline._convert_types(pipeline._normalize_columns(df)).reset_index(drop=True)
+
+
+def test_fingerprints_match_across_readers(raw_files, workdir):
+    path = raw_files['A']
+    # Una copia con un `passengers` mal formado al final se lee completa con el lector sin tipos
+    raw = pd.read_csv(path, dtype=str, keep_default_na=False)
+    broken = pd.concat([raw, raw.iloc[[0]].assign(passengers='n/d')], ignore_index=True)
+    broken.to_csv(workdir / 'a_broken.csv', index=False)
+
+    arrow = _steps_1_2(read_raw_csv(path))
+    chunked = [_steps_1_2(chunk) for chunk in read_raw_csv(path, chunksize=1000)]
+    fallback = _steps_1_2(read_raw_csv(str(workdir / 'a_broken.csv'))).iloc[:len(arrow)]
+
+    assert str(arrow['fecha'].dtype) == str(chunked[0]['fecha'].dtype) == 'datetime64[ns]'
+    expected = row_fingerprints(arrow)
+    assert (np.concatenate([row_fingerprints(chunk) for chunk in chunked]) == expected).all()
+    assert (row_fingerprints(fallback) == expected).all()
+
+
+def test_row_fingerprints_set():
+    seen = RowFingerprints()
+    first = seen.add(pd.util.hash_pandas_object(pd.Series([1, 2, 2, 3]), index=False).to_numpy())
+    second = seen.add(pd.util.hash_pandas_object(pd.Series([3, 4]), index=False).to_numpy())
+    assert first.tolist() == [True, True, False, True]
+    assert second.tolist() == [False, True]
+    assert len(seen) == 4
+
+
+def test_cross_file_duplicates_removed_with_fallback_reader(raw_files):
+    files = [('Archivo A', raw_files['A']), ('Archivo B', raw_files['B'])]
+    report, _, rows_out, _ = run_in_memory(files, fmt='parquet')
+
+    df = read_clean_data(output_parquet)
+    assert len(df) == rows_out
+    assert not df.duplicated().any()
+    # El resumen de calidad se cuenta sobre lo escrito
+    assert f"- Valores nulos: {int(df.isna().sum().sum())}" in report
+    assert "- Filas duplicadas: 0" in report
@@ -0,0 +1,59 @@
+"""
+Limpieza incremental: el dataset y el reporte son los de una corrida completa, con cualquier modo de lectura
+"""
+import json
+import os
+import re
+import numpy as np
+import pytest
+from clean_data import output_parquet, row_fingerprints, run_in_memory, run_incremental
+from manifest import CleaningManifest, manifest_dir
+from storage import read_clean_data
+
+
+def _duplicates(report):
+    return int(re.search(r"Duplicados entre archivos eliminados: (\d+)", report).group(1))
+
+
+def _dataset():
+    df = read_clean_data(output_parquet)
+    return len(df), np.sort(row_fingerprints(df))
+
+
+@pytest.mark.parametrize('first_chunksize, second_chunksize', [(900, None), (None, 900)])
+def test_incremental_matches_full_run(raw_files, first_chunksize, second_chunksize):
+    files = [('Archivo A', raw_files['A']), ('Archivo B', raw_files['B']), ('Archivo C', raw_files['C'])]
+    full_report, _, _, _ = run_in_memory(files, fmt='parquet')
+    full = _dataset()
+
+    CleaningManifest.clear()
+    run_incremental(files[:2], chunksize=first_chunksize)
+    report, rows_read, _, _ = run_incremental(files, chunksize=second_chunksize)
+
+    assert rows_read == 200
+    assert _duplicates(report) == _duplicates(full_report)
+    rows, fingerprints = _dataset()
+    assert rows == full[0]
+    assert (fingerprints == full[1]).all()
+    assert "- Valores nulos: 0" in report and "- Filas duplicadas: 0" in report
+
+
+def test_manifest_skips_unchanged_files(raw_files):
+    files = [('Archivo A', raw_files['A'])]
+    run_incremental(files)
+    _, rows_read, rows_added, _ = run_incremental(files)
+    assert (rows_read, rows_added) == (0, 0)
+
+
+def test_manifest_with_other_fingerprint_version_is_discarded(raw_files):
+    run_incremental([('Archivo A', raw_files['A'])])
+    manifest_file = os.path.join(manifest_dir, 'manifest.json')
+    with open(manifest_file, encoding='utf-8') as f:
+        data = json.load(f)
+    data['fingerprint_version'] = 1
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    assert len(CleaningManifest()) == 0
+    _, rows_read, _, _ = run_incremental([('Archivo A', raw_files['A'])])
+    assert rows_read == 6000
@@ -0,0 +1,65 @@
+"""
+Almacén de modelos SARIMA: agregar días con los parámetros guardados equivale a filtrar la serie completa
+"""
+import warnings
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from model_store import ModelStore, fit_full, update_model
+from order_search import model_trend
+
+ORDER, SEASONAL_ORDER = (1, 1, 1), (1, 0, 1, 7)
+
+
+def _daily_sales(days=240):
+    """Serie diaria con índice datetime64[us], como la que arma daily_series desde el Parquet"""
+    rng = np.random.default_rng(0)
+    t = np.arange(days)
+    index = pd.date_range('2025-01-01', periods=days, freq='D').as_unit('us')
+    return pd.Series(20700 + 3000 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 1500, days), index=index)
+
+
+def test_append_matches_filter_and_refit(tmp_path):
+    store = ModelStore(str(tmp_path / 'models'))
+    y = _daily_sales()
+
+    _, status = update_model(y.iloc[:200], 'ventas', ORDER, SEASONAL_ORDER, store=store)
+    assert status['accion'] == 'ajustado'
+    saved, meta = store.load('ventas')
+    assert meta['fin'] == '2025-07-19'
+
+    results, status = update_model(y.iloc[:210], 'ventas', ORDER, SEASONAL_ORDER, store=store)
+    assert status['accion'] == 'actualizado'
+    assert meta['params'] == store.load('ventas')[1]['params']
+
+    # Mismos parámetros sobre la serie completa: el pronóstico es el mismo
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        series = y.iloc[:210].to_numpy()
+        filtered = SARIMAX(series, order=ORDER, seasonal_order=SEASONAL_ORDER,
+                           trend=model_trend(ORDER, SEASONAL_ORDER)).filter(saved.params.to_numpy())
+    forecast = results.forecast(14).to_numpy()
+    np.testing.assert_allclose(forecast, filtered.forecast(14), rtol=1e-6)
+
+    # Y cercano al de re-estimar todo con los 210 días
+    refit = fit_full(y.iloc[:210], ORDER, SEASONAL_ORDER).forecast(14).to_numpy()
+    np.testing.assert_allclose(forecast, refit, rtol=0.05)
+
+
+def test_no_new_days_keeps_saved_model(tmp_path):
+    store = ModelStore(str(tmp_path / 'models'))
+    y = _daily_sales()
+    update_model(y.iloc[:200], 'ventas', ORDER, SEASONAL_ORDER, store=store)
+
+    _, status = update_model(y.iloc[:200], 'ventas', ORDER, SEASONAL_ORDER, store=store)
+    assert (status['accion'], status['motivo']) == ('sin cambios', 'sin días nuevos')
+
+
+def test_changed_history_refits(tmp_path):
+    store = ModelStore(str(tmp_path / 'models'))
+    y = _daily_sales()
+    update_model(y.iloc[:200], 'ventas', ORDER, SEASONAL_ORDER, store=store)
+
+    y.iloc[10] += 5000
+    _, status = update_model(y.iloc[:205], 'ventas', ORDER, SEASONAL_ORDER, store=store)
+    assert (status['accion'], status['motivo']) == ('ajustado', 'cambiaron los datos históricos')
@@ -0,0 +1,49 @@
+"""
+Búsqueda del orden ARIMA/SARIMA: el modelo elegido pronostica en la escala de la serie
+"""
+import warnings
+import numpy as np
+import pytest
+from statsmodels.tsa.statespace.sarimax import SARIMAX
+from order_search import is_degenerate, model_trend, neighbours, search_order
+
+
+def _daily_sales(seed=1, days=240):
+    """Serie diaria estacionaria con media ~20.7k y patrón semanal, como las ventas totales"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(days)
+    return 20700 + 3000 * np.sin(2 * np.pi * t / 7) + rng.normal(0, 3000, days)
+
+
+def test_model_trend():
+    assert model_trend((2, 0, 2), (1, 0, 1, 7)) == 'c'
+    assert model_trend((1, 1, 1), (0, 0, 0, 0)) == 'n'
+    assert model_trend((1, 0, 1), (0, 1, 1, 7)) == 'n'
+
+
+def test_degenerate_fit_is_rejected():
+    # Sin constante, este orden converge a AR≈1 cancelado con MA≈-1 y log-verosimilitud 0
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        results = SARIMAX(_daily_sales(), order=(2, 0, 2)).fit(disp=False, maxiter=50)
+    assert is_degenerate(results)
+
+
+@pytest.mark.parametrize('seasonal', [True, False])
+def test_selected_model_forecasts_on_series_scale(seasonal):
+    y = _daily_sales()
+    result = search_order(y, seasonal=seasonal, workers=1)
+    order, seasonal_order = result['order'], result['seasonal_order']
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        forecast = SARIMAX(y, order=order, seasonal_order=seasonal_order,
+                           trend=model_trend(order, seasonal_order)).fit(disp=False).forecast(14)
+    assert result['aic'] > 1000
+    assert abs(forecast.mean() / y.mean() - 1) < 0.25
+
+
+def test_neighbours_stay_within_limits():
+    assert all(min(candidate) >= 0 for candidate in neighbours((0, 0, 0, 0)))
+    assert (0, 1, 0, 0) in neighbours((0, 0, 0, 0), seasonal=False)
+    assert not any(candidate[2] or candidate[3] for candidate in neighbours((1, 1, 0, 0), seasonal=False))
@@ -0,0 +1,52 @@
+"""
+Perfilado en streaming: conteos exactos, bocetos aproximados y bloques leídos sin tipos
+"""
+import numpy as np
+import pandas as pd
+from profiler import HyperLogLog, QuantileDigest, profile_file
+from synthetic import write_synthetic_csv
+
+
+def test_profile_survives_fallback_reader_mid_file(workdir):
+    path = write_synthetic_csv(str(workdir / 'p.csv'), 3000, seed=3)
+    raw = pd.read_csv(path, dtype=str, keep_default_na=False)
+    raw.loc[1500, 'passengers'] = 'n/d'
+    raw.to_csv(path, index=False)
+
+    # Los bloques a partir de la fila 1400 se leen sin tipos numéricos
+    profile = profile_file(path, chunksize=700)
+    passengers = pd.to_numeric(raw['passengers'], errors='coerce')
+    column = profile.columns['passengers']
+
+    assert profile.rows == 3000
+    assert column.invalid == 1
+    assert column.nulls == int(passengers.isna().sum())
+    assert (column.min, column.max) == (passengers.min(), passengers.max())
+    assert profile.columns['fecha'].kind == 'datetime'
+
+
+def test_hyperloglog_estimate():
+    hll = HyperLogLog()
+    values = pd.Series(np.arange(50_000)).astype(str)
+    hll.add(values)
+    hll.add(values.iloc[:10_000])
+    assert abs(hll.estimate() - 50_000) / 50_000 < 0.03
+
+
+def test_quantile_digest_tails():
+    values = np.random.default_rng(0).lognormal(size=100_000)
+    digest = QuantileDigest()
+    for chunk in np.array_split(values, 10):
+        digest.add(chunk)
+    qs = [0.01, 0.5, 0.99]
+    np.testing.assert_allclose(digest.quantile(qs), np.quantile(values, qs), rtol=0.02)
+
+
+def test_duplicates_are_exact_across_chunks(workdir):
+    path = write_synthetic_csv(str(workdir / 'd.csv'), 4000, seed=4)
+    raw = pd.read_csv(path, dtype=str, keep_default_na=False)
+    raw = pd.concat([raw, raw.sample(700, random_state=0)], ignore_index=True)
+    raw.to_csv(path, index=False)
+
+    profile = profile_file(path, chunksize=500)
+    assert profile.duplicates == int(raw.duplicated().sum())
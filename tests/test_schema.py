@@ -0,0 +1,16 @@
+"""
+Lectura de los CSV crudos con el esquema declarado
+"""
+import pandas as pd
+from schema import read_raw_csv
+from synthetic import write_synthetic_csv
+
+
+def test_na_tokens_are_null_in_every_reader(workdir):
+    path = str(workdir / 'na.csv')
+    raw = pd.read_csv(write_synthetic_csv(path, 50, seed=5), dtype=str, keep_default_na=False)
+    raw.loc[:2, 'warehouse'] = ['NULL', 'n/a', '#N/A']
+    raw.to_csv(path, index=False)
+
+    assert read_raw_csv(path)['warehouse'].isna().sum() == 3
+    assert pd.concat(read_raw_csv(path, chunksize=20))['warehouse'].isna().sum() == 3